@@ -1,27 +1,43 @@
 # backend/app/agents/chatbot.py
 
 import logging
-from typing import List, Union, Dict, Any
+import threading
+from typing import AsyncIterator, List, Optional, Union, Dict, Any
 
 from backend.app.core.multi_llms import MultiLLMs
 from backend.app.core.embeddings import VectorStore
-from backend.app.utils.config import OPENAI_API_KEY
+from backend.app.utils.config import OPENAI_API_KEY, CHAT_MAX_HISTORY
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Vector store and its embedding clients are shared by every chat session
+_shared_vector_store: Optional[VectorStore] = None
+_shared_vector_store_lock = threading.Lock()
+
+def get_shared_vector_store() -> Optional[VectorStore]:
+    global _shared_vector_store
+    if _shared_vector_store is None:
+        with _shared_vector_store_lock:
+            if _shared_vector_store is None:
+                try:
+                    _shared_vector_store = VectorStore()
+                    logger.info("Vector store initialized successfully.")
+                except Exception as e:
+                    logger.error(f"Error initializing vector store: {e}")
+                    return None
+    return _shared_vector_store
+
 class Chatbot:
+    """
+    One chat session. Per-session state is only the conversation history;
+    the LLM clients and the vector store are shared across sessions.
+    """
     def __init__(self, **kwargs):
         self.multi_llms = MultiLLMs(api_keys=OPENAI_API_KEY, model="gpt-4o-mini", **kwargs)
         self.conversation_history: List[Dict[str, Any]] = []
         self.session_id = None
-
-        try:
-            self.vector_store = VectorStore()
-            logger.info("Vector store initialized successfully.")
-        except Exception as e:
-            logger.error(f"Error initializing vector store: {e}")
-            self.vector_store = None
+        self.vector_store = get_shared_vector_store()
 
     def set_session_id(self, session_id: str):
         self.session_id = session_id
@@ -47,6 +63,8 @@ class Chatbot:
             "response_type": response_type
         }
         self.conversation_history.append(interaction)
+        # Only the most recent turns are ever used as context
+        del self.conversation_history[:-CHAT_MAX_HISTORY]
         logger.info(f"Added to conversation history: Q: {question[:50]}...")
 
     def build_context_from_history(self, max_history: int = 5) -> str:
@@ -61,7 +79,14 @@ class Chatbot:
 
     def ask_chatbot(self, question: str) -> str:
         response = self.multi_llms.get_llm_chatbot().invoke(question)
-        
+        return self._response_text(response)
+
+    async def aask_chatbot(self, question: str) -> str:
+        response = await self.multi_llms.get_llm_chatbot().ainvoke(question)
+        return self._response_text(response)
+
+    @staticmethod
+    def _response_text(response: Any) -> str:
         # Extract content from response object
         if hasattr(response, 'content'):
             return response.content
@@ -77,13 +102,37 @@ class Chatbot:
         else:
             return str(response)
     
+    async def stream_chatbot(self, question: str) -> AsyncIterator[str]:
+        """
+        Yields the response text piece by piece as the chat model produces it.
+        """
+        async for chunk in self.multi_llms.get_llm_chatbot().astream(question):
+            content = chunk.content if hasattr(chunk, 'content') else str(chunk)
+            if content:
+                yield content
+
+    async def _stream_and_record(self, question: str, full_question: str, response_type: str) -> AsyncIterator[str]:
+        """
+        Streams the answer and stores the full text in the conversation history once the stream ends.
+        """
+        parts = []
+        async for token in self.stream_chatbot(full_question):
+            parts.append(token)
+            yield token
+        self.add_to_conversation_history(question=question, response="".join(parts), response_type=response_type)
+
+    def build_question(self, question: str, include_history: bool = False) -> str:
+        if include_history and self.conversation_history:
+            context = self.build_context_from_history()
+            return f"{context}\nUser: {question}"
+        return f"User: {question}"
+
+    def ask_stream(self, question: str, include_history: bool = False) -> AsyncIterator[str]:
+        return self._stream_and_record(question, self.build_question(question, include_history), "standard")
+
     def ask(self, question: str, include_history: bool = False) -> str:
         try:
-            if include_history and self.conversation_history:
-                context = self.build_context_from_history()
-                full_question = f"{context}\nUser: {question}"
-            else:
-                full_question = f"User: {question}"
+            full_question = self.build_question(question, include_history)
 
             response = self.ask_chatbot(full_question)
             self.add_to_conversation_history(question=question, response=response)
@@ -91,6 +140,17 @@ class Chatbot:
         except Exception as e:
             logger.error(f"Error occurred while asking chatbot: {e}")
             return "I'm sorry, I encountered an error processing your request."
+
+    async def aask(self, question: str, include_history: bool = False) -> str:
+        try:
+            full_question = self.build_question(question, include_history)
+
+            response = await self.aask_chatbot(full_question)
+            self.add_to_conversation_history(question=question, response=response)
+            return response
+        except Exception as e:
+            logger.error(f"Error occurred while asking chatbot: {e}")
+            return "I'm sorry, I encountered an error processing your request."
             
     def get_relevant_context(self, query: str) -> str:
         if not self.vector_store:
@@ -107,6 +167,21 @@ class Chatbot:
         except Exception as e:
             logger.error(f"Error occurred while getting relevant context: {e}")
             return "I'm sorry, I encountered an error processing your request."
+
+    async def aget_relevant_context(self, query: str) -> str:
+        if not self.vector_store:
+            logger.error("Vector store is not initialized.")
+            return "I don't know"
+
+        try:
+            relevant_docs = await self.vector_store.asearch_similar_content(query)
+            if not relevant_docs:
+                return "I don't know"
+
+            return "\n\n".join([doc.page_content for doc in relevant_docs])
+        except Exception as e:
+            logger.error(f"Error occurred while getting relevant context: {e}")
+            return "I'm sorry, I encountered an error processing your request."
         
     def add_transcript_to_vectorstore(self, transcript_id: str, transcript_text: str) -> bool:
         if not self.vector_store:
@@ -121,29 +196,50 @@ class Chatbot:
             logger.error(f"Error adding transcript to vector store: {e}")
             return False
 
+    async def aadd_transcript_to_vectorstore(self, transcript_id: str, transcript_text: str) -> bool:
+        if not self.vector_store:
+            logger.error("Vector store is not initialized.")
+            return False
+
+        try:
+            await self.vector_store.aadd_transcript(transcript_id, transcript_text)
+            logger.info(f"Transcript ID {transcript_id} added to vector store.")
+            return True
+        except Exception as e:
+            logger.error(f"Error adding transcript to vector store: {e}")
+            return False
+
+    def build_rag_question(self, question: str, context: str, include_history: bool = False) -> str:
+        context_parts = []
+        if include_history and self.conversation_history:
+            history_context = self.build_context_from_history()
+            context_parts.append(f"Previous conversation:\n{history_context}")
+
+        if context:
+            context_parts.append(f"Relevant information from transcript:\n{context}")
+            system_prompt = (
+                "You are a helpful assistant that answers questions based on video transcripts and conversation context. "
+                "Use the provided relevant information to answer the user's question accurately. "
+                "If the information doesn't contain the answer, say so clearly."
+            )
+        else:
+            system_prompt = (
+                "You are a helpful assistant. Answer the user's question based on your knowledge and any provided context."
+            )
+
+        full_context = "\n\n".join(context_parts) if context_parts else ""
+        return f"{system_prompt}\n\n{full_context}\nUser: {question}"
+
+    async def ask_with_rag_stream(self, question: str, include_history: bool = False) -> AsyncIterator[str]:
+        context = await self.aget_relevant_context(question)
+        full_question = self.build_rag_question(question, context, include_history)
+        async for token in self._stream_and_record(question, full_question, "rag"):
+            yield token
+
     def ask_with_rag(self, question: str, include_history: bool = False) -> str:
         try:
             context = self.get_relevant_context(question)
-
-            context_parts = []
-            if include_history and self.conversation_history:
-                history_context = self.build_context_from_history()
-                context_parts.append(f"Previous conversation:\n{history_context}")
-
-            if context:
-                context_parts.append(f"Relevant information from transcript:\n{context}")
-                system_prompt = (
-                    "You are a helpful assistant that answers questions based on video transcripts and conversation context. "
-                    "Use the provided relevant information to answer the user's question accurately. "
-                    "If the information doesn't contain the answer, say so clearly."
-                )
-            else:
-                system_prompt = (
-                    "You are a helpful assistant. Answer the user's question based on your knowledge and any provided context."
-                )
-
-            full_context = "\n\n".join(context_parts) if context_parts else ""
-            full_question = f"{system_prompt}\n\n{full_context}\nUser: {question}"
+            full_question = self.build_rag_question(question, context, include_history)
 
             response = self.ask_chatbot(full_question)
             self.add_to_conversation_history(question=question, response=response, response_type="rag")
@@ -151,4 +247,17 @@ class Chatbot:
         
         except Exception as e:
             logger.error(f"Error occurred while asking with RAG: {e}")
-            return "I'm sorry, I encountered an error processing your request."
\ No newline at end of file
+            return "I'm sorry, I encountered an error processing your request."
+
+    async def aask_with_rag(self, question: str, include_history: bool = False) -> str:
+        try:
+            context = await self.aget_relevant_context(question)
+            full_question = self.build_rag_question(question, context, include_history)
+
+            response = await self.aask_chatbot(full_question)
+            self.add_to_conversation_history(question=question, response=response, response_type="rag")
+            return response
+
+        except Exception as e:
+            logger.error(f"Error occurred while asking with RAG: {e}")
+            return "I'm sorry, I encountered an error processing your request."
@@ -2,10 +2,11 @@
 
 import asyncio
 import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from backend.app.core.multi_llms import MultiLLMs
 from backend.app.utils.nlp_utils import prompt_highlights, score_selection
 from backend.app.prompts.highlight_prompt import highlight_prompt
+from backend.app.transcript.segments import SegmentStore
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,13 +17,21 @@ class Highlighter:
     def __init__(self, **kwargs):
         self.multi_llms = MultiLLMs(**kwargs)
 
-    async def highlight_text(self, text: str) -> List[Dict[str, Any]]:
+    async def highlight_text(
+        self,
+        text: str,
+        segments: Optional[SegmentStore] = None,
+        use_cache: bool = True,
+        report: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
         """
         Highlights important sections of the provided text using LLMs.
+        use_cache False bypasses the LLM response cache; report["error"] is set when
+        the result is an error fallback rather than the model's answer.
         """
         async with semaphore:
             try:
-                candidate_highlights = await score_selection(text, top_n=5)
+                candidate_highlights = await score_selection(text, top_n=5, segments=segments)
 
                 if not candidate_highlights:
                     logging.info("No candidate highlights found after scoring.")
@@ -35,11 +44,13 @@ class Highlighter:
                     return []
                 
                 prompt = highlight_prompt.format_prompt(text=prompt_text).to_string()
-                response = await self.multi_llms.ainvoke(prompt)
+                response = await self.multi_llms.ainvoke(prompt, use_cache=use_cache)
 
                 response_text = getattr(response, 'content', response)
                 if response_text is None:
                     logging.error("LLM response content is None")
+                    if report is not None:
+                        report["error"] = "Empty LLM response"
                     return []
 
                 cleaned_response = response_text.strip().removeprefix("```json").removeprefix("```").removesuffix("```").strip()
@@ -49,8 +60,12 @@ class Highlighter:
                     return highlights_json
                 except json.JSONDecodeError as e:
                     logging.error(f"Failed to decode JSON from LLM response: {e}\nResponse: {cleaned_response}")
+                    if report is not None:
+                        report["error"] = f"Invalid JSON from LLM: {e}"
                     return []
             
             except Exception as e:
                 logging.error(f"An unexpected error occurred in highlight_text: {e}", exc_info=True)
+                if report is not None:
+                    report["error"] = str(e)
                 return []
\ No newline at end of file
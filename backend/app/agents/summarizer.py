@@ -1,55 +1,252 @@
 # backend/app/agents/summarizer.py
 
 import asyncio
+import hashlib
 import logging
 
-from typing import List
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
 from backend.app.prompts.summarize_prompt import summarize_chunk_prompt, summarize_merge_prompt
 from backend.app.core.multi_llms import MultiLLMs
-from backend.app.utils.splitter import text_splitter
-from backend.app.utils.config import GOOGLE_API_KEYS
+from backend.app.utils.splitter import transcript_chunks, count_tokens
+from backend.app.transcript.segments import SegmentStore
+from backend.app.utils.config import GOOGLE_API_KEYS, CHUNK_TOKENS, SUMMARY_MAX_CONCURRENCY, SUMMARY_MERGE_TOKEN_BUDGET
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class Summarizer:
+    """
+    Map-reduce summarizer. Chunk summaries are merged as a tree: each merge takes
+    as many consecutive child summaries as fit in merge_token_budget, and a merge
+    starts as soon as its children are ready, so depth grows logarithmically with length.
+    """
     def __init__(
-        self, 
-        api_keys: List[str] = GOOGLE_API_KEYS, 
-        model: str = "gemini-1.5-flash", 
-        chunk_size: int = 10000, **kwargs
+        self,
+        api_keys: List[str] = GOOGLE_API_KEYS,
+        model: str = "gemini-1.5-flash",
+        chunk_size: int = CHUNK_TOKENS,
+        merge_token_budget: int = SUMMARY_MERGE_TOKEN_BUDGET,
+        max_concurrency: int = SUMMARY_MAX_CONCURRENCY,
+        reuse_chunk_summaries: bool = True, **kwargs
     ):
         self.multi_llms = MultiLLMs(api_keys, model=model, **kwargs)
+        self.model = model
         self.chunk_size = chunk_size
+        self.merge_token_budget = merge_token_budget
+        self.max_concurrency = max_concurrency
+        self.reuse_chunk_summaries = reuse_chunk_summaries
 
-    async def summarize_chunk(self, text: str) -> str:
+    async def summarize_chunk(self, text: str, use_cache: bool = True) -> Optional[str]:
         """
-        Asynchronously summarizes a single chunk of text.
+        Asynchronously summarizes a single chunk of text; None if the call failed.
         """
         try:
             prompt = summarize_chunk_prompt.format_prompt(text=text)
-            return await self.multi_llms.ainvoke(prompt)
+            return (await self.multi_llms.ainvoke(prompt, use_cache=use_cache)).content
         except Exception as e:
             logger.error(f"Error summarizing chunk: {e}")
-            return f"Error summarizing chunk: {e}"
+            return None
 
-    async def summarize_chunks(self, text: str) -> str:
+    def chunk_key(self, chunk: str) -> str:
         """
-        Asynchronously summarizes a long text by splitting it into chunks and summarizing each chunk.
+        Identifies a chunk summary by chunk content, model and chunk prompt.
         """
-        chunks = text_splitter(text, chunk_size=self.chunk_size)
+        raw_key = "|".join([self.model, summarize_chunk_prompt.template, chunk])
+        return hashlib.sha256(raw_key.encode("utf-8")).hexdigest()
+
+    async def _stored_chunk_summaries(self, keys: List[str]) -> Dict[str, str]:
+        from backend.app.api.db import get_chunk_summaries
+        try:
+            return await get_chunk_summaries(keys)
+        except Exception as e:
+            logger.warning(f"Stored chunk summaries unavailable: {e}")
+            return {}
+
+    async def _save_chunk_summaries(self, tasks: Dict[str, asyncio.Task]) -> None:
+        from backend.app.api.db import save_chunk_summaries
+        summaries = {
+            key: task.result() for key, task in tasks.items()
+            if task.done() and not task.cancelled() and task.result()
+        }
+        try:
+            await save_chunk_summaries(summaries)
+        except Exception as e:
+            logger.warning(f"Could not store chunk summaries: {e}")
+
+    async def merge_summaries(
+        self,
+        summaries: List[str],
+        use_cache: bool = True,
+        report: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Merges consecutive summaries into one; on failure the summaries are passed on concatenated.
+        """
+        try:
+            prompt = summarize_merge_prompt.format_prompt(chunk_summaries="\n".join(summaries)).to_string()
+            return (await self.multi_llms.ainvoke(prompt, use_cache=use_cache)).content
+        except Exception as e:
+            logger.error(f"Error merging summaries: {e}")
+            if report is not None:
+                report["error"] = f"Merge failed: {e}"
+            return "\n".join(summaries)
+
+    async def _bounded(self, semaphore: asyncio.Semaphore, coro) -> Optional[str]:
+        async with semaphore:
+            return await coro
+
+    async def _merge_level(
+        self,
+        children: AsyncIterator[asyncio.Task],
+        semaphore: asyncio.Semaphore,
+        use_cache: bool = True,
+        report: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[asyncio.Task]:
+        """
+        Consumes one level's summaries in order and yields the next level's merge tasks.
+        A group closes once adding the next summary would exceed the token budget (it always
+        holds at least two summaries), and its merge is started right away.
+        """
+        group: List[str] = []
+        group_tokens = 0
+        async for child in children:
+            summary = await child
+            # Failed chunks are skipped
+            if not summary:
+                if report is not None:
+                    report["error"] = "Some chunk summaries failed"
+                continue
+            tokens = count_tokens(summary)
+            if len(group) >= 2 and group_tokens + tokens > self.merge_token_budget:
+                yield asyncio.ensure_future(self._bounded(semaphore, self.merge_summaries(group, use_cache, report)))
+                group, group_tokens = [], 0
+            group.append(summary)
+            group_tokens += tokens
+
+        if len(group) == 1:
+            yield asyncio.ensure_future(asyncio.sleep(0, result=group[0]))
+        elif group:
+            yield asyncio.ensure_future(self._bounded(semaphore, self.merge_summaries(group, use_cache, report)))
+
+    async def _eager(self, level: AsyncIterator[asyncio.Task]) -> AsyncIterator[asyncio.Task]:
+        """
+        Drives a level in the background, so it keeps starting merges while
+        the level above is still waiting on earlier ones.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def pump():
+            try:
+                async for task in level:
+                    await queue.put(task)
+            finally:
+                await queue.put(None)
+
+        pump_task = asyncio.ensure_future(pump())
+        try:
+            while (task := await queue.get()) is not None:
+                yield task
+            await pump_task
+        finally:
+            pump_task.cancel()
+
+    async def _reduce(
+        self,
+        tasks: AsyncIterator[asyncio.Task],
+        semaphore: asyncio.Semaphore,
+        use_cache: bool = True,
+        report: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Merges level after level until a single summary remains. Levels are chained
+        generators, so an upper merge starts while lower levels are still running.
+        """
+        level = self._eager(self._merge_level(tasks, semaphore, use_cache, report))
+        first = await anext(level, None)
+        if first is None:
+            return ""
+        second = await anext(level, None)
+        if second is None:
+            return await first
+
+        async def pending() -> AsyncIterator[asyncio.Task]:
+            yield first
+            yield second
+            async for task in level:
+                yield task
+
+        return await self._reduce(pending(), semaphore, use_cache, report)
+
+    async def reduce_summaries(
+        self,
+        summaries: Iterable[asyncio.Task],
+        semaphore: asyncio.Semaphore,
+        use_cache: bool = True,
+        report: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Tree-reduces ordered summary tasks into one summary.
+        """
+        async def children() -> AsyncIterator[asyncio.Task]:
+            for task in summaries:
+                yield task
+
+        return await self._reduce(children(), semaphore, use_cache, report)
+
+    def split(self, text: str, segments: Optional[SegmentStore] = None) -> List[str]:
+        """
+        Segment-aligned chunks from the shared chunker; content-defined boundaries keep
+        unchanged chunks identical across edits, so their stored summaries are reused.
+        """
+        return [chunk.text for chunk in transcript_chunks(text, segments, self.chunk_size)]
+
+    async def summarize_chunks(
+        self,
+        text: str,
+        segments: Optional[SegmentStore] = None,
+        use_cache: bool = True,
+        report: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Asynchronously summarizes a long text by splitting it into chunks, summarizing
+        each chunk with bounded concurrency and tree-reducing the chunk summaries.
+        With use_cache False, stored chunk summaries and cached LLM responses are not
+        used and every chunk is summarized again. When a fallback replaces part of the
+        result, report["error"] is set.
+        """
+        chunks = self.split(text, segments)
         if not chunks:
             logger.warning("No chunks to summarize.")
+            if report is not None:
+                report["error"] = "No chunks to summarize"
             return "No content to summarize."
         logger.info(f"Summarizing {len(chunks)} chunks of text.")
 
-        chunk_summaries = await asyncio.gather(
-            *[self.summarize_chunk(chunk) for chunk in chunks],
-            return_exceptions=True
-        )
+        keys = [self.chunk_key(chunk) for chunk in chunks]
+        reuse = self.reuse_chunk_summaries and use_cache
+        stored = await self._stored_chunk_summaries(list(set(keys))) if reuse else {}
 
-        chunk_summaries_texts = [msg.content for msg in chunk_summaries if not isinstance(msg, Exception)]
+        # Only new or changed chunks go to the LLM; the merges are always redone
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        new_tasks: Dict[str, asyncio.Task] = {}
+        chunk_tasks = []
+        for key, chunk in zip(keys, chunks):
+            if key in stored:
+                chunk_tasks.append(asyncio.ensure_future(asyncio.sleep(0, result=stored[key])))
+                continue
+            if key not in new_tasks:
+                new_tasks[key] = asyncio.ensure_future(self._bounded(semaphore, self.summarize_chunk(chunk, use_cache)))
+            chunk_tasks.append(new_tasks[key])
+        logger.info(f"Reusing {len(chunks) - len(new_tasks)} stored chunk summaries, summarizing {len(new_tasks)}.")
 
-        prompt = summarize_merge_prompt.format_prompt(chunk_summaries="\n".join(chunk_summaries_texts)).to_string()
-
-        return await self.multi_llms.ainvoke(prompt)
\ No newline at end of file
+        try:
+            summary = await self.reduce_summaries(chunk_tasks, semaphore, use_cache, report)
+        finally:
+            for task in chunk_tasks:
+                task.cancel()
+        # A forced run refreshes the stored chunk summaries
+        if self.reuse_chunk_summaries:
+            await self._save_chunk_summaries(new_tasks)
+        if not summary and report is not None:
+            report["error"] = "Every chunk summary failed"
+        return summary or "No content to summarize."
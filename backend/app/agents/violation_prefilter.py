@@ -0,0 +1,150 @@
+# backend/app/agents/violation_prefilter.py
+
+import asyncio
+import logging
+import threading
+import numpy as np
+
+from typing import Any, Dict, List, Optional
+from backend.app.utils.nlp_utils import model_manager, get_embeddings_ultra_batch, analyze_sentiment_ultra_batch
+from backend.app.utils.config import (
+    VIOLATION_PREFILTER_MODE,
+    VIOLATION_PREFILTER_THRESHOLD,
+    VIOLATION_PREFILTER_MARGIN,
+    VIOLATION_PREFILTER_SENTIMENT_WEIGHT,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# MiniLM only sees the first 512 tokens, so chunks and law documents are scored in windows
+WINDOW_CHARS = 1500
+
+def _windows(text: str, max_chars: int = WINDOW_CHARS) -> List[str]:
+    """
+    Groups whole lines into windows of at most max_chars (a single longer line is cut).
+    """
+    windows, current = [], ""
+    for line in text.splitlines():
+        while len(line) > max_chars:
+            windows.append(line[:max_chars])
+            line = line[max_chars:]
+        if current and len(current) + len(line) + 1 > max_chars:
+            windows.append(current)
+            current = ""
+        current = f"{current}\n{line}" if current else line
+    if current.strip():
+        windows.append(current)
+    return windows
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-9)
+
+class ViolationPrefilter:
+    """
+    Cheap CPU screen in front of the violation LLM. Each chunk is scored by the highest
+    window score, where a window scores its max cosine similarity to the law corpus
+    plus sentiment_weight times its negative-sentiment confidence. Chunks scoring below
+    threshold - margin are skipped; the margin trades LLM calls for recall.
+    """
+    def __init__(
+        self,
+        threshold: float = VIOLATION_PREFILTER_THRESHOLD,
+        margin: float = VIOLATION_PREFILTER_MARGIN,
+        sentiment_weight: float = VIOLATION_PREFILTER_SENTIMENT_WEIGHT
+    ):
+        self.threshold = threshold
+        self.margin = margin
+        self.sentiment_weight = sentiment_weight
+        self._law_embeddings: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+        self.total_chunks = 0
+        self.total_skipped = 0
+
+    def _law_matrix(self) -> np.ndarray:
+        """
+        Normalized embeddings of the law corpus windows, computed once.
+        """
+        if self._law_embeddings is None:
+            with self._lock:
+                if self._law_embeddings is None:
+                    from backend.app.core.embeddings import LawDataLoader
+                    windows = [
+                        window
+                        for doc in LawDataLoader().load_documents()
+                        for window in _windows(doc.page_content)
+                    ]
+                    self._law_embeddings = _normalize(get_embeddings_ultra_batch(windows))
+                    logger.info(f"Violation prefilter: embedded {len(windows)} law corpus windows")
+        return self._law_embeddings
+
+    def score_chunks(self, chunks: List[str]) -> List[float]:
+        """
+        Blocking: one score per chunk.
+        """
+        law = self._law_matrix()
+        windows, owners = [], []
+        for i, chunk in enumerate(chunks):
+            for window in _windows(chunk):
+                windows.append(window)
+                owners.append(i)
+        if not windows or not len(law):
+            return [float("inf")] * len(chunks)
+
+        similarity = (_normalize(get_embeddings_ultra_batch(windows)) @ law.T).max(axis=1)
+        sentiments = analyze_sentiment_ultra_batch(windows)
+
+        scores = [0.0] * len(chunks)
+        for owner, sim, sentiment in zip(owners, similarity, sentiments):
+            negative = sentiment["score"] if sentiment["label"] == "negative" else 0.0
+            scores[owner] = max(scores[owner], float(sim) + self.sentiment_weight * negative)
+        return scores
+
+    async def filter(self, chunks: List[str], enforce: bool = True) -> Dict[str, Any]:
+        """
+        Scores chunks off the event loop and returns the indices to send to the LLM,
+        plus skip statistics for this run. Any failure sends every chunk.
+        With enforce False (shadow mode) every chunk is sent, and "skipped" counts
+        the chunks that would have been skipped.
+        """
+        try:
+            await model_manager.initialize()
+            scores = await asyncio.get_event_loop().run_in_executor(
+                model_manager.cpu_executor, self.score_chunks, chunks
+            )
+        except Exception as e:
+            logger.warning(f"Violation prefilter failed, sending all chunks: {e}")
+            scores = [float("inf")] * len(chunks)
+
+        cutoff = self.threshold - self.margin
+        passed = [i for i, score in enumerate(scores) if score >= cutoff]
+        skipped = len(chunks) - len(passed)
+        selected = passed if enforce else list(range(len(chunks)))
+        self.total_chunks += len(chunks)
+        self.total_skipped += skipped
+
+        stats = {
+            "mode": "enforce" if enforce else "shadow",
+            "chunks": len(chunks),
+            "sent": len(selected),
+            "skipped": skipped,
+            "cutoff": round(cutoff, 3),
+            "scores": [round(score, 3) if np.isfinite(score) else None for score in scores],
+        }
+        logger.info(
+            f"Violation prefilter ({stats['mode']}): {skipped}/{len(chunks)} chunks below cutoff {cutoff:.2f}, "
+            f"sent {len(selected)} to the LLM; scores {stats['scores']}"
+        )
+        return {"selected": selected, "stats": stats}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": VIOLATION_PREFILTER_MODE,
+            "chunks": self.total_chunks,
+            "skipped": self.total_skipped,
+            "skip_rate": round(self.total_skipped / self.total_chunks, 3) if self.total_chunks else 0.0,
+        }
+
+# Global instance, so the law corpus is embedded once per process
+violation_prefilter = ViolationPrefilter()
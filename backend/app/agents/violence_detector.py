@@ -4,7 +4,7 @@ import asyncio
 import json
 import logging
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from backend.app.core.multi_llms import MultiLLMs
 from backend.app.core.embeddings import VectorStore
 from backend.app.prompts.violation_prompt import violation_prompt
@@ -12,7 +12,10 @@ from backend.app.prompts.violation_prompt import violation_prompt
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-from backend.app.utils.splitter import text_splitter
+from backend.app.utils.splitter import transcript_chunks
+from backend.app.transcript.segments import SegmentStore
+from backend.app.agents.violation_prefilter import violation_prefilter
+from backend.app.utils.config import VIOLATION_PREFILTER_MODE
 
 class ViolenceDetector:
     def __init__(self, **kwargs):
@@ -21,39 +24,79 @@ class ViolenceDetector:
         self.vector_store.load_vectorstore()
         self.semaphore = asyncio.Semaphore(8)
 
-    async def detect_violence(self, text: str) -> List[Dict[str, Any]]:
+    def _query_law_docs(self, embeddings: List[List[float]], k: int) -> List[str]:
+        """
+        Top-k law documents for all embeddings. Uses one batched query on the Chroma
+        collection behind the LangChain wrapper when it is reachable (a private
+        attribute), and one public similarity_search_by_vector per embedding otherwise.
+        """
+        vectorstore = self.vector_store.vectorstore
+        collection = getattr(vectorstore, "_collection", None)
+        if collection is not None and hasattr(collection, "query"):
+            try:
+                results = collection.query(
+                    query_embeddings=embeddings,
+                    n_results=k,
+                    include=["documents"]
+                )
+                documents = results["documents"]
+                if len(documents) == len(embeddings):
+                    return ["\n\n".join(docs) for docs in documents]
+                logger.warning("Batched law query returned an unexpected shape, searching per chunk")
+            except Exception as e:
+                logger.warning(f"Batched law query failed, searching per chunk: {e}")
+
+        return [
+            "\n\n".join(doc.page_content for doc in vectorstore.similarity_search_by_vector(embedding=embedding, k=k))
+            for embedding in embeddings
+        ]
+
+    async def retrieve_law_context(self, chunks: List[str], k: int = 3) -> List[str]:
+        """
+        Relevant law documents for every chunk: one async embedding call for all chunks,
+        then one batched vector lookup in a worker thread.
+        """
+        embeddings = await self.vector_store.query_embeddings.aembed_documents(chunks)
+        return await asyncio.to_thread(self._query_law_docs, embeddings, k)
+
+    async def detect_violence(
+        self,
+        text: str,
+        relevant_law_docs_text: Optional[str] = None,
+        use_cache: bool = True,
+        report: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
         """
         Detects violent content in the provided text.
+        report["error"] is set when the result is an error fallback.
         """
 
         if not self.vector_store.vectorstore:
             print("Vector store is not loaded. Please ensure the vector store is built and persisted.")
+            if report is not None:
+                report["error"] = "Vector store is not loaded"
             return []
 
         try:
-            query_embeddings = self.vector_store.query_embeddings.embed_query(text)
-
-            relevant_law_docs = self.vector_store.vectorstore.similarity_search_by_vector(
-                embedding=query_embeddings,
-                k=3
-            )  
-
-            relevant_law_docs_text = "\n\n".join([doc.page_content for doc in relevant_law_docs])
+            if relevant_law_docs_text is None:
+                relevant_law_docs_text = (await self.retrieve_law_context([text]))[0]
 
             prompt = violation_prompt.format(
                 relevant_law_docs=relevant_law_docs_text,
                 text=text
             )
 
-            response = await self.multi_llms.ainvoke(prompt)
+            response = await self.multi_llms.ainvoke(prompt, use_cache=use_cache)
 
-            return self.parse_response(response.content)
+            return self.parse_response(response.content, report)
 
         except Exception as e:
             print(f"Error in detect_violence: {e}")
+            if report is not None:
+                report["error"] = str(e)
             return []
         
-    def parse_response(self, response: str) -> List[Dict[str, Any]]:
+    def parse_response(self, response: str, report: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """
         Parses the LLM response (expected in JSON format) to extract violations.
         """
@@ -67,23 +110,62 @@ class ViolenceDetector:
                 return violations
             else:
                 print("Unexpected response format: Expected a list of violations.")
+                if report is not None:
+                    report["error"] = "LLM response is not a list of violations"
                 return []
         except json.JSONDecodeError as e:
             print(f"Failed to decode JSON from LLM response: {e}\nResponse: {cleaned_response}")
+            if report is not None:
+                report["error"] = f"Invalid JSON from LLM: {e}"
             return []
         
-    async def analyze_transcript_chunks(self, text: str) -> List[Dict[str, Any]]:
+    async def analyze_transcript_chunks(
+        self,
+        text: str,
+        segments: Optional[SegmentStore] = None,
+        use_cache: bool = True,
+        report: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
         """
         Runs the violence detection process.
+        use_cache False bypasses the LLM response cache; report["error"] is set when
+        a chunk's result is an error fallback, so the result is not complete, and
+        report["prefilter"] holds this run's pre-filter statistics.
         """
-        chunks = text_splitter(text)
+        # Same chunks as the summarizer, computed once per transcript
+        chunks = [chunk.text for chunk in transcript_chunks(text, segments)]
+
+        if not chunks:
+            return []
+        if not self.vector_store.vectorstore:
+            print("Vector store is not loaded. Please ensure the vector store is built and persisted.")
+            if report is not None:
+                report["error"] = "Vector store is not loaded"
+            return []
+
+        # Benign chunks are dropped locally before any embedding API or LLM call;
+        # in shadow mode they are only scored and logged
+        if VIOLATION_PREFILTER_MODE in ("shadow", "enforce"):
+            screened = await violation_prefilter.filter(chunks, enforce=VIOLATION_PREFILTER_MODE == "enforce")
+            if report is not None:
+                report["prefilter"] = screened["stats"]
+            chunks = [chunks[i] for i in screened["selected"]]
+            if not chunks:
+                return []
+
+        # Retrieval for all chunks happens up front, before any LLM call
+        try:
+            contexts = await self.retrieve_law_context(chunks)
+        except Exception as e:
+            print(f"Error retrieving law context: {e}")
+            if report is not None:
+                report["error"] = f"Law retrieval failed: {e}"
+            return []
 
-        async def analyze_with_semaphore(chunk: str) -> List[Dict[str, Any]]:
+        async def analyze_with_semaphore(chunk: str, context: str) -> List[Dict[str, Any]]:
             async with self.semaphore:
-                result = await self.detect_violence(chunk)
-                await asyncio.sleep(1) 
-                return result
+                return await self.detect_violence(chunk, context, use_cache, report)
 
-        tasks = [analyze_with_semaphore(chunk) for chunk in chunks]
+        tasks = [analyze_with_semaphore(chunk, context) for chunk, context in zip(chunks, contexts)]
         result = await asyncio.gather(*tasks)
         return [item for sublist in result for item in sublist]
\ No newline at end of file
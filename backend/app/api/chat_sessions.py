@@ -0,0 +1,90 @@
+# backend/app/api/chat_sessions.py
+
+import time
+import logging
+import threading
+
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from backend.app.agents.chatbot import Chatbot
+from backend.app.utils.config import CHAT_MAX_SESSIONS, CHAT_SESSION_IDLE_TTL
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class ChatSessionManager:
+    """
+    Bounded store of chat sessions. Sessions idle for longer than idle_ttl seconds expire,
+    and the least recently used session is evicted once max_sessions is reached.
+    """
+    def __init__(self, max_sessions: int = CHAT_MAX_SESSIONS, idle_ttl: int = CHAT_SESSION_IDLE_TTL):
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        # session_id -> (chatbot, last used), least recently used first
+        self.sessions: "OrderedDict[str, tuple]" = OrderedDict()
+        self.created = 0
+        self.expired = 0
+        self.evicted = 0
+        self._lock = threading.Lock()
+
+    def _prune(self, now: float) -> None:
+        while self.sessions:
+            session_id, (_, last_used) = next(iter(self.sessions.items()))
+            if now - last_used <= self.idle_ttl:
+                break
+            del self.sessions[session_id]
+            self.expired += 1
+
+    def get(self, session_id: str) -> Optional[Chatbot]:
+        """
+        The live session, marked as recently used, or None.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._prune(now)
+            entry = self.sessions.get(session_id)
+            if entry is None:
+                return None
+            self.sessions[session_id] = (entry[0], now)
+            self.sessions.move_to_end(session_id)
+            return entry[0]
+
+    def get_or_create(self, session_id: str) -> Chatbot:
+        chatbot = self.get(session_id)
+        if chatbot is not None:
+            return chatbot
+
+        with self._lock:
+            entry = self.sessions.get(session_id)
+            if entry is not None:
+                return entry[0]
+
+            chatbot = Chatbot()
+            chatbot.set_session_id(session_id)
+            self.sessions[session_id] = (chatbot, time.monotonic())
+            self.created += 1
+            while len(self.sessions) > self.max_sessions:
+                evicted_id, _ = self.sessions.popitem(last=False)
+                self.evicted += 1
+                logger.info(f"Evicted chat session {evicted_id}")
+            return chatbot
+
+    def remove(self, session_id: str) -> bool:
+        with self._lock:
+            return self.sessions.pop(session_id, None) is not None
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            self._prune(time.monotonic())
+            return {
+                "live_sessions": len(self.sessions),
+                "created": self.created,
+                "expired": self.expired,
+                "evicted": self.evicted,
+                "max_sessions": self.max_sessions,
+                "idle_ttl": self.idle_ttl,
+            }
+
+# Global instance
+chat_sessions = ChatSessionManager()
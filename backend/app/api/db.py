@@ -2,6 +2,8 @@
 
 from bson import ObjectId
 from datetime import datetime
+from typing import Any, Dict, List, Optional
+from pymongo import UpdateOne
 from motor.motor_asyncio import AsyncIOMotorClient
 from backend.app.api.schemas import TranscriptResponse
 
@@ -9,20 +11,24 @@ MONGODB_URL = "mongodb://localhost:27017"
 DB_NAME = "transcripts_db"
 COLLECTION_NAME = "transcripts"
 TARGET_COLLECTION_NAME = "target_transcripts"
+CHUNK_SUMMARY_COLLECTION_NAME = "chunk_summaries"
 
 client = AsyncIOMotorClient(MONGODB_URL)
 db = client[DB_NAME]
 collection = db[COLLECTION_NAME]
 target_collection = db[TARGET_COLLECTION_NAME]
+chunk_summary_collection = db[CHUNK_SUMMARY_COLLECTION_NAME]
 
-async def save_transcript(transcript: str, config: dict) -> TranscriptResponse:
+async def save_transcript(transcript: str, config: dict, segments: Optional[Dict[str, Any]] = None) -> TranscriptResponse:
     """
     Save the transcript to the database and return a response model.
     """
     record = TranscriptResponse(
         source=config["type_of_source"],
         transcript=transcript,
+        segments=segments,
         config=config,
+        analysis_meta={},
     )
     result = await collection.insert_one(record.model_dump())
     record.id = str(result.inserted_id)
@@ -49,4 +55,45 @@ async def update_transcript_fields(transcript_id: str, **kwargs) -> TranscriptRe
     )
     if result.modified_count == 1:
         return await get_transcript_by_id(transcript_id)
-    return None
\ No newline at end of file
+    return None
+
+async def save_analysis_results(
+    transcript_id: str,
+    results: Dict[str, Any],
+    meta: Dict[str, Optional[Dict[str, str]]]
+) -> None:
+    """
+    Store agent results and their analysis_meta entries. Entries are written on
+    dotted paths, so concurrent runs of different agents on the same transcript
+    do not overwrite each other's entries; a None entry is removed.
+    """
+    object_id = ObjectId(transcript_id)
+    # Older records have analysis_meta null or missing, and Mongo cannot set a dotted path under null
+    await collection.update_one({"_id": object_id, "analysis_meta": None}, {"$set": {"analysis_meta": {}}})
+
+    update: Dict[str, Any] = {"$set": {**results, "updated_at": datetime.now()}}
+    for field_name, entry in meta.items():
+        if entry is None:
+            update.setdefault("$unset", {})[f"analysis_meta.{field_name}"] = ""
+        else:
+            update["$set"][f"analysis_meta.{field_name}"] = entry
+    await collection.update_one({"_id": object_id}, update)
+
+async def get_chunk_summaries(keys: List[str]) -> Dict[str, str]:
+    """
+    Stored chunk summaries for the given chunk keys, in one query.
+    """
+    cursor = chunk_summary_collection.find({"_id": {"$in": keys}}, {"summary": 1})
+    return {doc["_id"]: doc["summary"] async for doc in cursor}
+
+async def save_chunk_summaries(summaries: Dict[str, str]) -> None:
+    """
+    Upsert chunk summaries keyed by chunk key.
+    """
+    if not summaries:
+        return
+    now = datetime.now()
+    await chunk_summary_collection.bulk_write([
+        UpdateOne({"_id": key}, {"$set": {"summary": summary, "updated_at": now}}, upsert=True)
+        for key, summary in summaries.items()
+    ])
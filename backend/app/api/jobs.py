@@ -0,0 +1,185 @@
+# backend/app/api/jobs.py
+
+import uuid
+import asyncio
+import logging
+
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from backend.app.api.schemas import JobStatusResponse, BatchStatusResponse
+from backend.app.utils.config import TRANSCRIPTION_WORKERS, MAX_TRACKED_JOBS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class Job:
+    """
+    In-memory state of a background job.
+    """
+    def __init__(self, kind: str, source: Optional[str] = None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.source = source
+        self.status = "queued"
+        self.stage = "queued"
+        self.progress = 0.0
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now()
+        self.updated_at = self.created_at
+
+    def start(self) -> None:
+        self.status = "running"
+        self.updated_at = datetime.now()
+
+    def update(self, stage: str, progress: float) -> None:
+        self.stage = stage
+        self.progress = progress
+        self.updated_at = datetime.now()
+
+    def to_response(self) -> JobStatusResponse:
+        return JobStatusResponse(
+            job_id=self.id,
+            kind=self.kind,
+            source=self.source,
+            status=self.status,
+            stage=self.stage,
+            progress=self.progress,
+            result=self.result,
+            error=self.error,
+            created_at=self.created_at,
+            updated_at=self.updated_at,
+        )
+
+class Batch:
+    """
+    A group of jobs submitted together; its limiter bounds how many run at once.
+    """
+    def __init__(self, concurrency: int):
+        self.id = uuid.uuid4().hex
+        self.concurrency = concurrency
+        self.limiter = asyncio.Semaphore(concurrency)
+        self.job_ids: List[str] = []
+        self.errors: List[Dict[str, str]] = []
+        self.created_at = datetime.now()
+
+    def to_response(self, jobs: Dict[str, Job]) -> BatchStatusResponse:
+        items = [jobs[job_id].to_response() for job_id in self.job_ids if job_id in jobs]
+        counts: Dict[str, int] = {}
+        for item in items:
+            counts[item.status] = counts.get(item.status, 0) + 1
+        return BatchStatusResponse(
+            batch_id=self.id,
+            concurrency=self.concurrency,
+            total=len(self.job_ids) + len(self.errors),
+            counts=counts,
+            items=items,
+            errors=self.errors,
+            created_at=self.created_at,
+        )
+
+class JobManager:
+    """
+    Runs blocking pipelines on a bounded thread pool and tracks their progress,
+    so the event loop stays free while jobs are in flight.
+    """
+    def __init__(self, max_workers: int = TRANSCRIPTION_WORKERS, max_tracked: int = MAX_TRACKED_JOBS):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="transcribe")
+        self.max_tracked = max_tracked
+        self.jobs: Dict[str, Job] = {}
+        self.batches: Dict[str, Batch] = {}
+        self._tasks: set = set()
+
+    def submit(
+        self,
+        kind: str,
+        blocking_fn: Callable[..., Any],
+        on_done: Callable[[Any], Awaitable[Dict[str, Any]]],
+        cleanup: Optional[Callable[[], None]] = None,
+        source: Optional[str] = None,
+        limiter: Optional[asyncio.Semaphore] = None
+    ) -> Job:
+        """
+        Schedule a job. blocking_fn(progress_callback) runs on the worker pool;
+        on_done(result) then runs on the event loop (e.g. for the Mongo write).
+        A limiter semaphore caps how many jobs of one group run at the same time.
+        """
+        job = Job(kind, source)
+        self.jobs[job.id] = job
+        self._prune()
+
+        task = asyncio.create_task(self._run(job, blocking_fn, on_done, cleanup, limiter))
+        # Keep a reference so the task is not garbage collected mid-flight
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def _run(self, job: Job, blocking_fn, on_done, cleanup, limiter=None) -> None:
+        loop = asyncio.get_running_loop()
+
+        def report(stage: str, progress: float) -> None:
+            loop.call_soon_threadsafe(job.update, stage, progress)
+
+        def run_on_worker() -> Any:
+            # Marked running only once a worker thread picks the job up; until then it stays queued
+            loop.call_soon_threadsafe(job.start)
+            return blocking_fn(report)
+
+        try:
+            if limiter:
+                async with limiter:
+                    result = await loop.run_in_executor(self.executor, run_on_worker)
+            else:
+                result = await loop.run_in_executor(self.executor, run_on_worker)
+            job.update("saving", 0.9)
+            job.result = await on_done(result)
+            job.status = "completed"
+            job.update("completed", 1.0)
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {e}")
+            job.status = "failed"
+            job.error = str(e)
+            job.update("failed", job.progress)
+        finally:
+            if cleanup:
+                cleanup()
+
+    def run_blocking(self, fn: Callable[..., Any], *args) -> Awaitable[Any]:
+        """
+        Run a blocking call on the worker pool and await its result.
+        """
+        return asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    def create_batch(self, concurrency: int) -> "Batch":
+        batch = Batch(concurrency)
+        self.batches[batch.id] = batch
+        return batch
+
+    def get_batch(self, batch_id: str) -> Optional["Batch"]:
+        return self.batches.get(batch_id)
+
+    def list_jobs(self) -> List[Job]:
+        return sorted(self.jobs.values(), key=lambda job: job.created_at, reverse=True)
+
+    def _prune(self) -> None:
+        """
+        Forget the oldest finished jobs once more than max_tracked are stored.
+        """
+        excess = len(self.jobs) - self.max_tracked
+        if excess <= 0:
+            return
+        finished = [job for job in self.list_jobs()[::-1] if job.status in ("completed", "failed")]
+        for job in finished[:excess]:
+            del self.jobs[job.id]
+
+        # Batches whose jobs have all been forgotten go too
+        for batch_id in [b.id for b in self.batches.values() if b.job_ids and not any(j in self.jobs for j in b.job_ids)]:
+            del self.batches[batch_id]
+
+# Global instance
+job_manager = JobManager()
@@ -1,6 +1,7 @@
 # backend/app/api/routes.py
 
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi.responses import StreamingResponse
 from typing import List
 from backend.app.api.db import get_transcript_by_id
 from backend.app.api.services import process_youtube, process_upload, agents, TaskType
@@ -10,13 +11,29 @@ from backend.app.api.schemas import (
     ChatRequest, 
     ChatRagRequest,
     ChatResponse,
+    JobSubmitResponse,
+    JobStatusResponse,
+    BatchIngestRequest,
+    BatchSubmitResponse,
+    BatchStatusResponse,
     AddTranscriptRequest,
     ConversationHistoryResponse
 )
+from backend.app.api.services import (
+    submit_youtube_job,
+    submit_upload_job,
+    get_job_status,
+    list_job_statuses,
+    submit_batch_job,
+    get_batch_status,
+    get_llm_stats,
+)
 from backend.app.api.services import (
     chat_ask,
     chat_ask_with_rag,
+    chat_stream,
     clear_chat_history,
+    get_chat_session_stats,
     add_transcript_to_vectorstore,
 )
 
@@ -45,6 +62,45 @@ async def transcript_upload(
     except HTTPException as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/jobs/youtube", response_model=JobSubmitResponse)
+async def job_youtube(
+    url: str = Form(..., description="YouTube video URL"),
+    captions: bool = Form(True, description="Use YouTube captions if available"),
+    provider: str = Form("GROQ", description="Provider for the transcription service"),
+    model: str = Form("llama-3.3-70b-versatile", description="Model to use for transcription"),
+    language: str = Form("en", description="Language code for transcription")
+):
+    """Queue a YouTube transcription job"""
+    return await submit_youtube_job(url, captions, provider, model, language)
+
+@router.post("/jobs/upload", response_model=JobSubmitResponse)
+async def job_upload(
+    file: UploadFile = File(..., description="Audio or video file to transcribe"),
+    language: str = Form("en", description="Language code for transcription")
+):
+    """Queue a transcription job for an uploaded file"""
+    return await submit_upload_job(file, language)
+
+@router.post("/jobs/batch", response_model=BatchSubmitResponse)
+async def job_batch(request: BatchIngestRequest):
+    """Queue transcription jobs for a list of URLs and/or a playlist"""
+    return await submit_batch_job(request)
+
+@router.get("/jobs/batch/{batch_id}", response_model=BatchStatusResponse)
+async def job_batch_status(batch_id: str):
+    """Get per-item status of a batch"""
+    return get_batch_status(batch_id)
+
+@router.get("/jobs", response_model=List[JobStatusResponse])
+async def list_jobs_endpoint():
+    """List background jobs"""
+    return list_job_statuses()
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def job_status_endpoint(job_id: str):
+    """Get stage and progress of a background job"""
+    return get_job_status(job_id)
+
 @router.get("/transcript/{transcript_id}")
 async def get_transcript_(transcript_id: str):
     try:
@@ -62,8 +118,12 @@ async def get_transcript_(transcript_id: str):
     }
 
 @router.post("/transcript/agents/{transcript_id}")
-async def run_agents(transcript_id: str, task_type: List[TaskType] = Form(...)):
-    return await agents(transcript_id, task_type)
+async def run_agents(
+    transcript_id: str,
+    task_type: List[TaskType] = Form(...),
+    force: bool = Form(False, description="Recompute even if stored results are up to date")
+):
+    return await agents(transcript_id, task_type, force)
 
 @router.post("/chat/add-transcript", response_model=dict)
 async def add_transcript_endpoint(request: AddTranscriptRequest):
@@ -92,6 +152,27 @@ async def chat_ask_rag_endpoint(request: ChatRagRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/chat/ask/stream")
+async def chat_ask_stream_endpoint(request: ChatRequest):
+    """Ask chatbot a question, streaming the answer as server-sent events"""
+    return StreamingResponse(
+        chat_stream(request.session_id, request.question, request.include_history),
+        media_type="text/event-stream"
+    )
+
+@router.post("/chat/ask-rag/stream")
+async def chat_ask_rag_stream_endpoint(request: ChatRagRequest):
+    """Ask chatbot with RAG, streaming the answer as server-sent events"""
+    return StreamingResponse(
+        chat_stream(request.session_id, request.question, request.include_history, rag=True),
+        media_type="text/event-stream"
+    )
+
+@router.get("/chat/sessions/stats")
+async def chat_session_stats_endpoint():
+    """Live chat sessions and evictions"""
+    return get_chat_session_stats()
+
 @router.delete("/chat/clear/{session_id}")
 async def clear_chat_endpoint(session_id: str):
     """Clear chat conversation history"""
@@ -100,3 +181,8 @@ async def clear_chat_endpoint(session_id: str):
         return {"success": success, "message": "Chat history cleared" if success else "Failed to clear chat history"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/llm/stats")
+async def llm_stats_endpoint():
+    """LLM key quota utilization"""
+    return get_llm_stats()
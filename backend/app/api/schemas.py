@@ -22,22 +22,32 @@ class TranscriptConfig(BaseModel):
     type_of_source: str = Field(..., description="Type of source for the transcript (e.g., 'video', 'audio')")
     source_url_or_path: str = Field(..., description="URL or path to the source")
     use_youtube_captions: bool = Field(True, description="Whether to use YouTube captions if available")
-    transcription_method: str = Field("Cloud Whisper", description="Method used for transcription (e.g., 'Cloud Whisper', 'Local Whisper')")
+    transcription_method: str = Field("Cloud Whisper", description="Method used for transcription (e.g., 'Cloud Whisper', 'Local Whisper', 'Faster Whisper')")
     language: str = Field("en", description="Language code for transcription (e.g., 'en', 'es', 'fr')")
     provider: str = Field("GROQ", description="Provider for the transcription service (e.g., 'GROQ', 'Google')")
     parallel_api_calls: int = Field(10, description="Number of parallel API calls to make")
     max_output_tokens: int = Field(4096, description="Maximum number of output tokens for the transcription")
     base_url: str = Field(..., description="Base URL for the transcription service API")
     model : str = Field("llama-3.3-70b-versatile", description="Model to use for transcription")
+    chunked_transcription: bool = Field(True, description="Split long audio at silences and transcribe chunks in parallel")
+    audio_chunk_seconds: int = Field(600, description="Maximum duration of each audio chunk in seconds")
+    whisper_model: str = Field("base", description="Local Whisper model size (e.g., 'base', 'small', 'medium')")
+    use_cache: bool = Field(True, description="Reuse a cached transcript for the same source, language and method")
+    streaming_pipeline: bool = Field(False, description="Opt-in: transcribe fixed-length audio segments while the source is still downloading (cuts are not silence-aligned)")
+    stream_segment_seconds: int = Field(300, description="Length of each streamed audio segment in seconds")
+    vad_filter: bool = Field(False, description="Drop non-speech audio before transcription")
+    beam_size: int = Field(1, description="Beam size for the Faster Whisper engine (1 = greedy)")
 
 class TranscriptResponse(BaseModel):
     id: Optional[str] = Field(None, description="Unique identifier for the transcript")
     title: Optional[str] = Field(None, description="Title of the transcript")
     transcript: str = Field(..., description="The generated transcript text")
+    segments: Optional[Dict[str, Any]] = Field(None, description="Segment store: start/end seconds and text offsets (see SegmentStore)")
     config: TranscriptConfig = Field(..., description="Configuration used for the transcription")
     summary: Optional[str] = Field(None, description="Summary of the transcript")
     highlights: Optional[List[HighlightItem]] = Field(None, description="List of highlights from the transcript")
     violations: Optional[List[ViolenceItem]] = Field(None, description="List of violations detected in the transcript")
+    analysis_meta: Optional[Dict[str, Dict[str, str]]] = Field(None, description="Per result field: transcript content hash and agent version it was computed from")
     created_at: datetime = Field(default_factory=datetime.now, description="Timestamp when the transcript was created")
     updated_at: datetime = Field(default_factory=datetime.now, description="Timestamp when the transcript was last updated")
 
@@ -62,4 +72,44 @@ class AddTranscriptRequest(BaseModel):
 
 class ConversationHistoryResponse(BaseModel):
     session_id: str = Field(..., description="Chat session ID")
-    history: List[Dict[str, Any]] = Field(..., description="Conversation history")
\ No newline at end of file
+    history: List[Dict[str, Any]] = Field(..., description="Conversation history")
+
+class JobSubmitResponse(BaseModel):
+    job_id: str = Field(..., description="Background job ID")
+    status: str = Field(..., description="Initial job status")
+
+class JobStatusResponse(BaseModel):
+    job_id: str = Field(..., description="Background job ID")
+    kind: str = Field(..., description="Kind of job (e.g., 'youtube', 'upload')")
+    source: Optional[str] = Field(None, description="Source URL of the job, if any")
+    status: str = Field(..., description="Job status (queued, running, completed, failed)")
+    stage: str = Field(..., description="Current pipeline stage")
+    progress: float = Field(0.0, description="Approximate progress from 0.0 to 1.0")
+    result: Optional[Dict[str, Any]] = Field(None, description="Job result once completed")
+    error: Optional[str] = Field(None, description="Error message if the job failed")
+    created_at: datetime = Field(..., description="Timestamp when the job was submitted")
+    updated_at: datetime = Field(..., description="Timestamp of the last status change")
+
+class BatchIngestRequest(BaseModel):
+    urls: List[str] = Field(default_factory=list, description="YouTube video URLs to transcribe")
+    playlist_url: Optional[str] = Field(None, description="YouTube playlist URL whose videos are added to the batch")
+    captions: bool = Field(True, description="Use YouTube captions if available")
+    provider: str = Field("GROQ", description="Provider for the transcription service")
+    model: str = Field("llama-3.3-70b-versatile", description="Model to use for transcription")
+    language: str = Field("en", description="Language code for transcription")
+    concurrency: Optional[int] = Field(None, description="Maximum items processed at once (defaults to a value based on available transcription keys)")
+
+class BatchSubmitResponse(BaseModel):
+    batch_id: str = Field(..., description="Batch ID")
+    job_ids: List[str] = Field(..., description="Job ID of each queued item, in input order")
+    concurrency: int = Field(..., description="Maximum items processed at once")
+    errors: List[Dict[str, str]] = Field(default_factory=list, description="Items rejected before queueing")
+
+class BatchStatusResponse(BaseModel):
+    batch_id: str = Field(..., description="Batch ID")
+    concurrency: int = Field(..., description="Maximum items processed at once")
+    total: int = Field(..., description="Number of items in the batch")
+    counts: Dict[str, int] = Field(..., description="Number of items per status")
+    items: List[JobStatusResponse] = Field(..., description="Status of each item")
+    errors: List[Dict[str, str]] = Field(default_factory=list, description="Items rejected before queueing")
+    created_at: datetime = Field(..., description="Timestamp when the batch was submitted")
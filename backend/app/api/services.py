@@ -1,36 +1,44 @@
 #backend/app/api/services.py
 
 import os
+import json
 import uuid
 import logging
 import tempfile
 
-from typing import List, Literal, Dict, Any
+from typing import AsyncIterator, List, Literal, Dict, Any
 from fastapi import UploadFile, HTTPException
 
-from backend.app.api.db import get_transcript_by_id, save_transcript, update_transcript_fields
-from backend.app.core.langgraph_flow import TranscriptWorkflow
-from backend.app.transcript.transcription import get_transcript
-from backend.app.utils.config import get_config
+from backend.app.api.db import get_transcript_by_id, save_transcript, update_transcript_fields, save_analysis_results
+from backend.app.core.langgraph_flow import get_workflow, agent_version, transcript_content_hash
+from backend.app.transcript.transcription import get_transcript_segments
+from backend.app.transcript.segments import SegmentStore
+from backend.app.utils.config import get_config, BATCH_DEFAULT_CONCURRENCY
 from backend.app.agents.chatbot import Chatbot
-from backend.app.api.schemas import ChatResponse, ConversationHistoryResponse
+from backend.app.api.schemas import (
+    ChatResponse,
+    ConversationHistoryResponse,
+    JobSubmitResponse,
+    JobStatusResponse,
+    TranscriptResponse,
+    BatchIngestRequest,
+    BatchSubmitResponse,
+    BatchStatusResponse,
+)
+from backend.app.api.jobs import job_manager
+from backend.app.api.chat_sessions import chat_sessions
+from backend.app.core.key_scheduler import scheduler_utilization
+from backend.app.core.multi_llms import client_pool_size
+from backend.app.core.llm_cache import llm_cache_stats
+from backend.app.agents.violation_prefilter import violation_prefilter
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 TaskType = Literal["summarize", "highlight", "violation"]
 
-async def process_youtube(
-        url: str, 
-        captions: bool, 
-        provider: str, 
-        model: str, 
-        language: str
-) -> dict:
-    """
-    Process transcript for YouTube video.
-    """
-    config = get_config({
+def _youtube_config(url: str, captions: bool, provider: str, model: str, language: str) -> dict:
+    return get_config({
         "type_of_source": "YouTube Video",
         "source_url_or_path": url,
         "use_youtube_captions": captions,
@@ -39,14 +47,47 @@ async def process_youtube(
         "provider": provider,
         "model": model
     })
-    transcript = get_transcript(config)
-    transcript_id = await save_transcript(transcript, config)
+
+async def _save_upload_to_temp(file: UploadFile) -> str:
+    """
+    Validate an uploaded file and write it to a temp file, returning its path.
+    """
+    if not file.filename.lower().endswith(('.mp3', '.mp4', '.wav', '.m4a', '.webm')):
+        raise HTTPException(status_code=400, detail="Unsupported file type.")
+
+    suffix = os.path.splitext(file.filename)[1]
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+        tmp.write(await file.read())
+        return tmp.name
+
+def _remove_file(path: str) -> None:
+    if os.path.exists(path):
+        os.remove(path)
+
+async def _store_transcript(segments: SegmentStore, config: dict) -> dict:
+    transcript = segments.to_transcript()
+    # The text buffer would duplicate the transcript, so only the arrays are stored
+    record = await save_transcript(transcript, config, segments.to_dict(include_text=False))
     return {
-        "id": transcript_id.id,
+        "id": record.id,
         "transcript": transcript,
         "config": config
     }
 
+async def process_youtube(
+        url: str, 
+        captions: bool, 
+        provider: str, 
+        model: str, 
+        language: str
+) -> dict:
+    """
+    Process transcript for YouTube video.
+    """
+    config = _youtube_config(url, captions, provider, model, language)
+    segments = await job_manager.run_blocking(get_transcript_segments, config)
+    return await _store_transcript(segments, config)
+
 async def process_upload(
         file: UploadFile, 
         language: str
@@ -54,13 +95,7 @@ async def process_upload(
     """
     Process transcript for uploaded file.
     """
-    if not file.filename.lower().endswith(('.mp3', '.mp4', '.wav', '.m4a', '.webm')):
-        raise HTTPException(status_code=400, detail="Unsupported file type.")
-
-    suffix = os.path.splitext(file.filename)[1]
-    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-        temp_file_path = tmp.name
-        tmp.write(await file.read())
+    temp_file_path = await _save_upload_to_temp(file)
 
     try:
         config = get_config({
@@ -68,62 +103,224 @@ async def process_upload(
             "source_url_or_path": temp_file_path,
             "language": language,
         })
-        transcript = get_transcript(config)
-        transcript_id = await save_transcript(transcript, config)
-        return {
-            "id": transcript_id.id,
-            "transcript": transcript,
-            "config": config
-        }
+        segments = await job_manager.run_blocking(get_transcript_segments, config)
+        return await _store_transcript(segments, config)
     finally:
-        if os.path.exists(temp_file_path):
-            os.remove(temp_file_path)
+        _remove_file(temp_file_path)
+
+async def submit_youtube_job(
+        url: str,
+        captions: bool,
+        provider: str,
+        model: str,
+        language: str
+) -> JobSubmitResponse:
+    """
+    Queue a YouTube transcription job and return its ID immediately.
+    """
+    config = _youtube_config(url, captions, provider, model, language)
+    job = job_manager.submit(
+        "youtube",
+        lambda report: get_transcript_segments(config, report),
+        lambda segments: _store_transcript(segments, config),
+        source=url,
+    )
+    return JobSubmitResponse(job_id=job.id, status=job.status)
+
+async def submit_upload_job(file: UploadFile, language: str) -> JobSubmitResponse:
+    """
+    Queue a transcription job for an uploaded file and return its ID immediately.
+    """
+    temp_file_path = await _save_upload_to_temp(file)
+    config = get_config({
+        "type_of_source": "Local File",
+        "source_url_or_path": temp_file_path,
+        "language": language,
+    })
+    job = job_manager.submit(
+        "upload",
+        lambda report: get_transcript_segments(config, report),
+        lambda segments: _store_transcript(segments, config),
+        cleanup=lambda: _remove_file(temp_file_path),
+    )
+    return JobSubmitResponse(job_id=job.id, status=job.status)
+
+def _playlist_video_urls(playlist_url: str) -> List[str]:
+    import pytubefix as pytube
+    return list(pytube.Playlist(playlist_url).video_urls)
+
+async def submit_batch_job(request: BatchIngestRequest) -> BatchSubmitResponse:
+    """
+    Queue one transcription job per URL (and per playlist video) under a shared
+    concurrency limit. Items fail independently of each other.
+    """
+    urls = list(request.urls)
+    errors: List[Dict[str, str]] = []
+    if request.playlist_url:
+        try:
+            urls.extend(await job_manager.run_blocking(_playlist_video_urls, request.playlist_url))
+        except Exception as e:
+            errors.append({"source": request.playlist_url, "error": f"Cannot expand playlist: {e}"})
+
+    if not urls and not errors:
+        raise HTTPException(status_code=400, detail="No URLs or playlist provided.")
+
+    # Same video listed twice is transcribed once
+    urls = list(dict.fromkeys(urls))
+    batch = job_manager.create_batch(max(1, request.concurrency or BATCH_DEFAULT_CONCURRENCY))
+    batch.errors.extend(errors)
+
+    for url in urls:
+        config = _youtube_config(url, request.captions, request.provider, request.model, request.language)
+        job = job_manager.submit(
+            "youtube",
+            lambda report, config=config: get_transcript_segments(config, report),
+            lambda segments, config=config: _store_transcript(segments, config),
+            source=url,
+            limiter=batch.limiter,
+        )
+        batch.job_ids.append(job.id)
+
+    return BatchSubmitResponse(
+        batch_id=batch.id,
+        job_ids=batch.job_ids,
+        concurrency=batch.concurrency,
+        errors=batch.errors,
+    )
+
+def get_batch_status(batch_id: str) -> BatchStatusResponse:
+    """
+    Per-item status of a batch.
+    """
+    batch = job_manager.get_batch(batch_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return batch.to_response(job_manager.jobs)
+
+def get_job_status(job_id: str) -> JobStatusResponse:
+    """
+    Current status of a background job.
+    """
+    job = job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_response()
+
+def list_job_statuses() -> List[JobStatusResponse]:
+    """
+    Status of all tracked background jobs, newest first.
+    """
+    return [job.to_response() for job in job_manager.list_jobs()]
+
+def get_llm_stats() -> Dict[str, Any]:
+    """
+    Per-key quota utilization of the LLM schedulers, pooled clients, response cache
+    counters and violation pre-filter skip rate.
+    """
+    return {
+        "schedulers": scheduler_utilization(),
+        "pooled_clients": client_pool_size(),
+        "response_cache": llm_cache_stats(),
+        "violation_prefilter": violation_prefilter.stats(),
+    }
+
+async def _record_segments(transcript_id: str, record: TranscriptResponse) -> SegmentStore:
+    """
+    Segment store of a transcript record, its text rebuilt from the transcript.
+    Older records without stored segments are parsed from the text once, and the
+    result is saved back to the record.
+    """
+    if record.segments:
+        try:
+            return SegmentStore.from_dict(record.segments, record.transcript)
+        except ValueError as e:
+            logger.warning(f"Stored segments of {transcript_id} unusable, re-parsing: {e}")
+    segments = SegmentStore.from_transcript(record.transcript)
+    if len(segments):
+        await update_transcript_fields(transcript_id, segments=segments.to_dict(include_text=False))
+    return segments
+
+def _stored_result(value: Any) -> Any:
+    if isinstance(value, list):
+        return [item.model_dump() if hasattr(item, "model_dump") else item for item in value]
+    return value
 
 async def agents(
         transcript_id: str,
-        task_type: List[TaskType]
+        task_type: List[TaskType],
+        force: bool = False
 ) -> Dict[str, Any]:
     """
     Run specified agents on the transcript.
+    Results already stored for the same transcript content and agent version are
+    returned as-is unless force is set, in which case they are recomputed from scratch.
+    Results that are error fallbacks are stored but not marked fresh, so the next call retries them.
+    A violation run also returns its pre-filter statistics.
     """
     transcript_record = await get_transcript_by_id(transcript_id)
     if not transcript_record:
         raise HTTPException(status_code=404, detail="Transcript not found")
 
-    workflow = TranscriptWorkflow()
-    transcript_text = transcript_record.transcript
     field_map = {
         "summarize": "summary",
         "highlight": "highlights",
         "violation": "violations",
     }
+    for task in task_type:
+        if task not in field_map:
+            raise HTTPException(status_code=400, detail=f"Invalid task type: {task}")
+
+    transcript_text = transcript_record.transcript
+    content_hash = transcript_content_hash(transcript_text)
+    analysis_meta = transcript_record.analysis_meta or {}
 
     results: Dict[str, Any] = {}
-    for task_type in task_type:
-        if task_type not in field_map:
-            raise HTTPException(status_code=400, detail=f"Invalid task type: {task_type}")
+    cached: List[str] = []
+    stale: List[str] = []
+    failed: List[str] = []
+    prefilter = None
+    for task in dict.fromkeys(task_type):
+        field_name = field_map[task]
+        stored = getattr(transcript_record, field_name)
+        fresh = {"content_hash": content_hash, "version": agent_version(task)}
+        if not force and stored is not None and analysis_meta.get(field_name) == fresh:
+            results[field_name] = _stored_result(stored)
+            cached.append(task)
+        else:
+            stale.append(task)
 
-        out = await workflow.run(transcript_text=transcript_text, task_type=task_type)
-        field_name = field_map[task_type]
-        results[field_name] = out.get(field_name)
+    if stale:
+        segments = await _record_segments(transcript_id, transcript_record)
+        # All stale agents run in parallel; their results land in one state and one write
+        out = await get_workflow().run(transcript_text=transcript_text, task_type=stale, segments=segments, force=force)
+        failed = [task for task in stale if task in out.get("failed", [])]
+        prefilter = out.get("prefilter")
 
-        await update_transcript_fields(transcript_id, **{field_name: results[field_name]})
+        updates: Dict[str, Any] = {}
+        meta: Dict[str, Any] = {}
+        for task in stale:
+            field_name = field_map[task]
+            results[field_name] = out.get(field_name)
+            updates[field_name] = results[field_name]
+            meta[field_name] = None if task in failed else {"content_hash": content_hash, "version": agent_version(task)}
+        await save_analysis_results(transcript_id, updates, meta)
 
     return {
         "id": transcript_id,
         "tasks": task_type,
+        "cached": cached,
+        "failed": failed,
+        "prefilter": prefilter,
         "results": results
     }
 
-chat_instances: Dict[str, Chatbot] = {}
-
 def get_or_create_chatbot(session_id: str) -> Chatbot:
     """Get existing chatbot instance or create new one"""
-    if session_id not in chat_instances:
-        chatbot = Chatbot()
-        chatbot.set_session_id(session_id)
-        chat_instances[session_id] = chatbot
-    return chat_instances[session_id]
+    return chat_sessions.get_or_create(session_id)
+
+def get_chat_session_stats() -> Dict[str, int]:
+    """Live chat sessions and eviction counters"""
+    return chat_sessions.stats()
 
 async def add_transcript_to_vectorstore(transcript_id: str) -> bool:
     """Add transcript to vector store"""
@@ -135,7 +332,7 @@ async def add_transcript_to_vectorstore(transcript_id: str) -> bool:
         
         # Use any chatbot instance to access vector store
         chatbot = Chatbot()
-        success = chatbot.add_transcript_to_vectorstore(transcript_id, transcript_record.transcript)
+        success = await chatbot.aadd_transcript_to_vectorstore(transcript_id, transcript_record.transcript)
         return success
     except Exception as e:
         logger.error(f"Error adding transcript to vector store: {e}")
@@ -145,7 +342,7 @@ async def chat_ask(session_id: str, question: str, include_history: bool = False
     """Ask chatbot a question"""
     try:
         chatbot = get_or_create_chatbot(session_id)
-        response = chatbot.ask(question, include_history)
+        response = await chatbot.aask(question, include_history)
         
         return ChatResponse(
             session_id=session_id,
@@ -161,7 +358,7 @@ async def chat_ask_with_rag(session_id: str, question: str, include_history: boo
     """Ask chatbot with RAG"""
     try:
         chatbot = get_or_create_chatbot(session_id)
-        response = chatbot.ask_with_rag(question, include_history)
+        response = await chatbot.aask_with_rag(question, include_history)
         
         return ChatResponse(
             session_id=session_id,
@@ -173,11 +370,44 @@ async def chat_ask_with_rag(session_id: str, question: str, include_history: boo
         logger.error(f"Error in chat_ask_with_rag: {e}")
         raise HTTPException(status_code=500, detail="Error processing RAG chat request")
 
+def _sse_event(data: Dict[str, Any], event: str = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+async def chat_stream(session_id: str, question: str, include_history: bool = False, rag: bool = False) -> AsyncIterator[str]:
+    """
+    Server-sent events for a chat answer: one "data" event per token,
+    then a "done" event with the full response (or an "error" event).
+    """
+    response_type = "rag" if rag else "standard"
+    parts = []
+    try:
+        chatbot = get_or_create_chatbot(session_id)
+        stream = chatbot.ask_with_rag_stream(question, include_history) if rag else chatbot.ask_stream(question, include_history)
+        async for token in stream:
+            parts.append(token)
+            yield _sse_event({"token": token})
+    except Exception as e:
+        logger.error(f"Error in chat_stream: {e}")
+        yield _sse_event({"detail": "Error processing chat request"}, event="error")
+        return
+
+    yield _sse_event(
+        ChatResponse(
+            session_id=session_id,
+            question=question,
+            response="".join(parts),
+            response_type=response_type
+        ).model_dump(),
+        event="done"
+    )
+
 async def clear_chat_history(session_id: str) -> bool:
     """Clear chat conversation history"""
     try:
-        if session_id in chat_instances:
-            chat_instances[session_id].clear_conversation_history()
+        chatbot = chat_sessions.get(session_id)
+        if chatbot is not None:
+            chatbot.clear_conversation_history()
             return True
         return False
     except Exception as e:
@@ -3,11 +3,15 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from backend.app.api.routes import router as api_router
 from backend.app.utils.nlp_utils import init_models, clear_all_caches
+from backend.app.transcript.whisper_pool import whisper_pool
+from backend.app.core.langgraph_flow import get_workflow
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     try:
         await init_models()
+        await whisper_pool.initialize()
+        get_workflow()
         print("Models initialized successfully!")
     except Exception as e:
         print("Error during startup:", e)
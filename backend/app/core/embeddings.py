@@ -3,6 +3,7 @@
 import os
 import re
 import glob
+import asyncio
 import functools
 
 from typing import Dict, List
@@ -200,6 +201,18 @@ class VectorStore:
             print(f"Error during similarity search: {e}")
             return []
 
+    async def asearch_similar_content(self, query: str, top_k: int = 3):
+        """
+        Non-blocking search_similar_content: the embedding call and Chroma query run in a worker thread.
+        """
+        return await asyncio.to_thread(self.search_similar_content, query, top_k)
+
+    async def aadd_transcript(self, transcript_id: str, transcript_text: str):
+        """
+        Non-blocking add_transcript.
+        """
+        await asyncio.to_thread(self.add_transcript, transcript_id, transcript_text)
+
 # if __name__ == "__main__":
 #     vectorstore = LawVectorStore()
 
@@ -0,0 +1,171 @@
+# backend/app/core/key_scheduler.py
+
+import time
+import asyncio
+import threading
+
+from typing import Any, Collection, Dict, List, Optional, Sequence, Tuple
+from backend.app.utils.config import LLM_KEY_RPM, LLM_KEY_TPM
+
+class TokenBucket:
+    """
+    Classic token bucket: holds up to capacity tokens, refilled continuously at capacity per minute.
+    """
+    def __init__(self, capacity: float):
+        self.capacity = capacity
+        self.rate = capacity / 60.0
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def headroom(self) -> float:
+        return self.tokens / self.capacity
+
+    def wait_time(self, amount: float) -> float:
+        """
+        Seconds until amount tokens are available.
+        """
+        missing = min(amount, self.capacity) - self.tokens
+        return max(0.0, missing / self.rate)
+
+class KeyScheduler:
+    """
+    Routes each LLM call to the API key with the most requests-per-minute and
+    tokens-per-minute headroom. When every key is exhausted, callers wait for
+    the earliest refill instead of failing.
+    """
+    def __init__(self, keys: Sequence[str], rpm: int = LLM_KEY_RPM, tpm: int = LLM_KEY_TPM):
+        if not keys:
+            raise ValueError("No API keys available.")
+        self.keys = list(dict.fromkeys(keys))
+        self.requests = {key: TokenBucket(rpm) for key in self.keys}
+        self.tokens = {key: TokenBucket(tpm) for key in self.keys}
+        self.blocked_until = {key: 0.0 for key in self.keys}
+        self.calls = {key: 0 for key in self.keys}
+        self.rate_limited = {key: 0 for key in self.keys}
+        self.waiting = 0
+        self._lock = threading.Lock()
+
+    def _try_acquire(self, estimated_tokens: int, exclude: Collection[str] = ()) -> Tuple[Optional[str], float]:
+        """
+        Take one request and estimated_tokens from the best key, skipping excluded keys
+        unless no other key exists.
+        Returns (key, 0) on success or (None, seconds to wait).
+        """
+        with self._lock:
+            now = time.monotonic()
+            best_key, best_headroom, min_wait = None, -1.0, float("inf")
+            candidates = [key for key in self.keys if key not in exclude] or self.keys
+
+            for key in candidates:
+                requests, tokens = self.requests[key], self.tokens[key]
+                requests.refill(now)
+                tokens.refill(now)
+
+                wait = max(
+                    self.blocked_until[key] - now,
+                    requests.wait_time(1),
+                    tokens.wait_time(estimated_tokens),
+                )
+                if wait > 0:
+                    min_wait = min(min_wait, wait)
+                    continue
+
+                headroom = min(requests.headroom(), tokens.headroom())
+                if headroom > best_headroom:
+                    best_key, best_headroom = key, headroom
+
+            if best_key is None:
+                return None, min_wait
+
+            self.requests[best_key].tokens -= 1
+            self.tokens[best_key].tokens -= estimated_tokens
+            self.calls[best_key] += 1
+            return best_key, 0.0
+
+    async def acquire(self, estimated_tokens: int = 0, exclude: Collection[str] = ()) -> str:
+        """
+        Wait (without blocking the event loop) until a key can take the call, then return it.
+        """
+        self.waiting += 1
+        try:
+            while True:
+                key, wait = self._try_acquire(estimated_tokens, exclude)
+                if key:
+                    return key
+                await asyncio.sleep(wait)
+        finally:
+            self.waiting -= 1
+
+    def acquire_blocking(self, estimated_tokens: int = 0) -> str:
+        """
+        Blocking variant of acquire for synchronous callers.
+        """
+        while True:
+            key, wait = self._try_acquire(estimated_tokens)
+            if key:
+                return key
+            time.sleep(wait)
+
+    def settle(self, key: str, estimated_tokens: int, actual_tokens: Optional[int]) -> None:
+        """
+        Correct the token bucket once the real usage of a call is known.
+        """
+        if actual_tokens is None:
+            return
+        with self._lock:
+            self.tokens[key].tokens -= actual_tokens - estimated_tokens
+
+    def penalize(self, key: str, retry_after: float = 60.0) -> None:
+        """
+        Stop routing to a key that was rate limited by the provider.
+        """
+        with self._lock:
+            self.blocked_until[key] = max(self.blocked_until[key], time.monotonic() + retry_after)
+            self.requests[key].tokens = 0
+            self.rate_limited[key] += 1
+
+    def utilization(self) -> Dict[str, Any]:
+        """
+        Per-key usage of the RPM/TPM budgets; keys are masked.
+        """
+        with self._lock:
+            now = time.monotonic()
+            keys: List[Dict[str, Any]] = []
+            for key in self.keys:
+                self.requests[key].refill(now)
+                self.tokens[key].refill(now)
+                keys.append({
+                    "key": f"...{key[-4:]}",
+                    "rpm_used": round(1 - self.requests[key].headroom(), 3),
+                    "tpm_used": round(1 - self.tokens[key].headroom(), 3),
+                    "calls": self.calls[key],
+                    "rate_limited": self.rate_limited[key],
+                    "blocked_for": round(max(0.0, self.blocked_until[key] - now), 1),
+                })
+            return {"waiting": self.waiting, "keys": keys}
+
+_schedulers: Dict[Tuple[str, Tuple[str, ...]], KeyScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+def get_key_scheduler(provider: str, keys: Sequence[str]) -> KeyScheduler:
+    """
+    Shared scheduler per (provider, key set), so every agent draws from the same budgets.
+    """
+    # A bare key string would otherwise be split into one-character keys
+    if isinstance(keys, str):
+        keys = [keys]
+    registry_key = (provider, tuple(keys))
+    with _schedulers_lock:
+        if registry_key not in _schedulers:
+            _schedulers[registry_key] = KeyScheduler(keys)
+        return _schedulers[registry_key]
+
+def scheduler_utilization() -> Dict[str, Any]:
+    return {
+        f"{provider}:{len(keys)} keys": scheduler.utilization()
+        for (provider, keys), scheduler in _schedulers.items()
+    }
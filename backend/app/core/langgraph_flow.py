@@ -1,19 +1,90 @@
 # backend/app/core/langgraph_flow.py
 
+import hashlib
 import logging
+import operator
+import threading
 
 from langgraph.graph import StateGraph, END
+from typing import Annotated, Any, Dict, List, Optional, TypedDict, Union
 from backend.app.api.schemas import WorkflowState, HighlightItem
+from backend.app.transcript.segments import SegmentStore
+from backend.app.prompts.summarize_prompt import summarize_chunk_prompt, summarize_merge_prompt
+from backend.app.prompts.highlight_prompt import highlight_prompt
+from backend.app.prompts.violation_prompt import violation_prompt
+from backend.app.utils.config import (
+    VIOLATION_PREFILTER_MODE,
+    VIOLATION_PREFILTER_THRESHOLD,
+    VIOLATION_PREFILTER_MARGIN,
+    VIOLATION_PREFILTER_SENTIMENT_WEIGHT,
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Task type -> graph node
+TASK_NODES = {
+    "summarize": "summarizer",
+    "highlight": "highlighter",
+    "violation": "violence_detector",
+}
+
+# Bump when an agent's logic changes in a way that invalidates stored results.
+# Prompt edits are picked up automatically through the prompt hash.
+AGENT_VERSIONS = {
+    "summarize": "1",
+    "highlight": "1",
+    "violation": "1",
+}
+
+TASK_PROMPTS = {
+    "summarize": (summarize_chunk_prompt, summarize_merge_prompt),
+    "highlight": (highlight_prompt,),
+    "violation": (violation_prompt,),
+}
+
+def agent_version(task_type: str) -> str:
+    """
+    Version of a task's results: the agent version plus a hash of its prompt templates,
+    and for violations the pre-filter cutoff when the pre-filter is enforced.
+    """
+    prompt_hash = hashlib.sha256(
+        "\n".join(prompt.template for prompt in TASK_PROMPTS[task_type]).encode("utf-8")
+    ).hexdigest()[:12]
+    version = f"{AGENT_VERSIONS[task_type]}:{prompt_hash}"
+    # An enforcing pre-filter changes which chunks reach the LLM; shadow mode does not
+    if task_type == "violation" and VIOLATION_PREFILTER_MODE == "enforce":
+        version += (
+            f":prefilter-{VIOLATION_PREFILTER_THRESHOLD - VIOLATION_PREFILTER_MARGIN:.3f}"
+            f"-{VIOLATION_PREFILTER_SENTIMENT_WEIGHT:.3f}"
+        )
+    return version
+
+def transcript_content_hash(transcript_text: str) -> str:
+    return hashlib.sha256(transcript_text.encode("utf-8")).hexdigest()
+
+class AgentState(TypedDict, total=False):
+    """
+    Graph state. Each agent node writes only its own result key,
+    so nodes fanned out in parallel merge without conflicts; failed
+    is appended to by every node whose result is an error fallback.
+    """
+    transcript_text: str
+    task_types: List[str]
+    segments: Optional[SegmentStore]
+    force: bool
+    failed: Annotated[List[str], operator.add]
+    prefilter: Optional[Dict[str, Any]]
+    summary: Optional[str]
+    highlights: Optional[List[Dict[str, Any]]]
+    violations: Optional[List[Dict[str, Any]]]
+
 class TranscriptWorkflow:
     def __init__(self):
         """
         Init graph for transcript workflow.
         """
-        self.graph = StateGraph(dict)
+        self.graph = StateGraph(AgentState)
 
         self.graph.add_node("router", self.router_node)
         self.graph.add_node("summarizer", self.summarize_node)
@@ -22,14 +93,11 @@ class TranscriptWorkflow:
 
         self.graph.set_entry_point("router")
 
+        # The router may return several nodes, which then run in parallel
         self.graph.add_conditional_edges(
             "router",
-            lambda state: state["next"],
-            {
-                "summarizer": "summarizer",
-                "highlighter": "highlighter",
-                "violence_detector": "violence_detector"
-            }
+            self.route,
+            {node: node for node in TASK_NODES.values()}
         )
 
         self.graph.add_edge("summarizer", END)
@@ -38,48 +106,115 @@ class TranscriptWorkflow:
 
         self.compiled = self.graph.compile()
 
-    async def summarize_node(self, state: dict) -> dict:
-        from backend.app.agents.summarizer import Summarizer
-        summarizer = Summarizer()
+        # Agents are created on first use and reused across runs
+        self._agents: Dict[str, Any] = {}
+        self._agents_lock = threading.Lock()
+
+    def _agent(self, name: str):
+        if name not in self._agents:
+            with self._agents_lock:
+                if name not in self._agents:
+                    if name == "summarizer":
+                        from backend.app.agents.summarizer import Summarizer
+                        self._agents[name] = Summarizer()
+                    elif name == "highlighter":
+                        from backend.app.agents.highlighter import Highlighter
+                        self._agents[name] = Highlighter()
+                    else:
+                        from backend.app.agents.violence_detector import ViolenceDetector
+                        self._agents[name] = ViolenceDetector()
+        return self._agents[name]
+
+    def _node_output(self, task_type: str, field_name: str, value: Any, report: Dict[str, Any]) -> dict:
+        if "error" not in report:
+            return {field_name: value}
+        logger.warning(f"{task_type} result is incomplete: {report['error']}")
+        return {field_name: value, "failed": [task_type]}
+
+    async def summarize_node(self, state: AgentState) -> dict:
+        summarizer = self._agent("summarizer")
         text = state["transcript_text"]
-        summary = await summarizer.summarize_chunks(text)
-        return {"summary": summary.content}
+        report: Dict[str, Any] = {}
+        summary = await summarizer.summarize_chunks(
+            text, segments=state.get("segments"), use_cache=not state.get("force"), report=report
+        )
+        return self._node_output("summarize", "summary", summary, report)
 
-    async def highlight_node(self, state: dict) -> dict:
-        from backend.app.agents.highlighter import Highlighter
-        highlighter = Highlighter()
+    async def highlight_node(self, state: AgentState) -> dict:
+        highlighter = self._agent("highlighter")
         text = state["transcript_text"]
-        highlights = await highlighter.highlight_text(text)
+        report: Dict[str, Any] = {}
+        highlights = await highlighter.highlight_text(
+            text, segments=state.get("segments"), use_cache=not state.get("force"), report=report
+        )
         highlights_clean = [
             highlight if isinstance(highlight, dict) else highlight.model_dump()
             for highlight in highlights
         ]
-        return {"highlights": highlights_clean}
+        return self._node_output("highlight", "highlights", highlights_clean, report)
 
-    async def violation_node(self, state: dict) -> dict:
-        from backend.app.agents.violence_detector import ViolenceDetector
-        violence_detector = ViolenceDetector()
+    async def violation_node(self, state: AgentState) -> dict:
+        violence_detector = self._agent("violence_detector")
         text = state["transcript_text"]
-        violations = await violence_detector.analyze_transcript_chunks(text)
-        return {"violations": violations}
+        report: Dict[str, Any] = {}
+        violations = await violence_detector.analyze_transcript_chunks(
+            text, segments=state.get("segments"), use_cache=not state.get("force"), report=report
+        )
+        output = self._node_output("violation", "violations", violations, report)
+        if "prefilter" in report:
+            output["prefilter"] = report["prefilter"]
+        return output
+
+    def router_node(self, state: AgentState) -> dict:
+        """
+        Entry node; routing happens on its outgoing edges.
+        """
+        return {}
 
-    def router_node(self, state: dict) -> dict:
+    def route(self, state: AgentState) -> List[str]:
         """
-        Route the workflow to the appropriate node based on the task type.
+        Route the workflow to the node of every requested task type.
         """
-        task_type = state.get("task_type", "summarize")
-        next_node = "summarizer"
-        if task_type == "highlight":
-            next_node = "highlighter"
-        elif task_type == "violation":
-            next_node = "violence_detector"
-
-        state["next"] = next_node
-        return state
-
-    async def run(self, transcript_text: str, task_type: str) -> dict:
-        state = {
+        task_types = state.get("task_types") or ["summarize"]
+        return [TASK_NODES[task_type] for task_type in dict.fromkeys(task_types)]
+
+    async def run(
+        self,
+        transcript_text: str,
+        task_type: Union[str, List[str]],
+        segments: Optional[SegmentStore] = None,
+        force: bool = False
+    ) -> dict:
+        """
+        Run one task type, or several in parallel, and return the merged state.
+        With force, agents recompute everything instead of reusing stored chunk
+        summaries or cached LLM responses. Tasks whose result is an error fallback
+        are listed under "failed".
+        """
+        task_types = [task_type] if isinstance(task_type, str) else list(task_type)
+        unknown = [t for t in task_types if t not in TASK_NODES]
+        if unknown:
+            raise ValueError(f"Invalid task type: {', '.join(unknown)}")
+
+        state: AgentState = {
             "transcript_text": transcript_text,
-            "task_type": task_type
+            "task_types": task_types,
+            "segments": segments,
+            "force": force,
+            "failed": []
         }
         return await self.compiled.ainvoke(state)
+
+_workflow: Optional[TranscriptWorkflow] = None
+_workflow_lock = threading.Lock()
+
+def get_workflow() -> TranscriptWorkflow:
+    """
+    The process-wide workflow; its graph is compiled once.
+    """
+    global _workflow
+    if _workflow is None:
+        with _workflow_lock:
+            if _workflow is None:
+                _workflow = TranscriptWorkflow()
+    return _workflow
@@ -0,0 +1,149 @@
+# backend/app/core/llm_cache.py
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+from backend.app.utils.config import (
+    LLM_CACHE_PATH,
+    LLM_CACHE_MEMORY_ENTRIES,
+    LLM_CACHE_MAX_ENTRIES,
+    LLM_CACHE_TTL_HOURS,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Expired and excess rows are purged once every this many writes
+EVICT_EVERY = 100
+
+def llm_cache_key(model: str, prompt_text: str, params: Dict[str, Any]) -> str:
+    """
+    Hash of (model, prompt, generation params) identifying one LLM response.
+    """
+    raw_key = json.dumps([model, prompt_text, params], sort_keys=True, default=repr)
+    return hashlib.sha256(raw_key.encode("utf-8")).hexdigest()
+
+class LLMResponseCache:
+    """
+    LLM responses cached in an in-memory LRU in front of a SQLite file.
+    Entries expire after ttl_hours; the SQLite tier keeps at most max_entries,
+    dropping the least recently used rows first.
+    """
+    def __init__(
+        self,
+        path: str = LLM_CACHE_PATH,
+        memory_entries: int = LLM_CACHE_MEMORY_ENTRIES,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        ttl_hours: float = LLM_CACHE_TTL_HOURS
+    ):
+        self.memory_entries = memory_entries
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_hours * 3600
+        self.memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, model TEXT, message TEXT, created_at REAL, last_accessed REAL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_last_accessed ON responses(last_accessed)")
+        self.db.commit()
+
+    def _remember(self, key: str, created_at: float, message: BaseMessage) -> None:
+        self.memory[key] = (created_at, message)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[BaseMessage]:
+        now = time.time()
+        with self._lock:
+            entry = self.memory.get(key)
+            if entry and now - entry[0] <= self.ttl_seconds:
+                self.memory.move_to_end(key)
+                self.memory_hits += 1
+                return entry[1]
+
+            row = self.db.execute(
+                "SELECT message, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                self.memory.pop(key, None)
+                self.misses += 1
+                return None
+
+            self.db.execute("UPDATE responses SET last_accessed = ? WHERE key = ?", (now, key))
+            self.db.commit()
+            message = messages_from_dict([json.loads(row[0])])[0]
+            self._remember(key, row[1], message)
+            self.disk_hits += 1
+            return message
+
+    def set(self, key: str, model: str, message: BaseMessage) -> None:
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, message)
+            self.db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, model, json.dumps(message_to_dict(message)), now, now)
+            )
+            self.db.commit()
+            self._writes += 1
+            if self._writes % EVICT_EVERY == 0:
+                self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        self.db.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+        self.db.execute(
+            "DELETE FROM responses WHERE key IN ("
+            "SELECT key FROM responses ORDER BY last_accessed DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+        self.db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            disk_entries = self.db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "memory_entries": len(self.memory),
+            "disk_entries": disk_entries,
+        }
+
+_llm_cache: Optional[LLMResponseCache] = None
+_cache_lock = threading.Lock()
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """
+    Lazily open the process-wide LLM response cache; None if the SQLite file cannot be opened.
+    """
+    global _llm_cache
+    if _llm_cache is None:
+        with _cache_lock:
+            if _llm_cache is None:
+                try:
+                    _llm_cache = LLMResponseCache()
+                except sqlite3.Error as e:
+                    logger.warning(f"LLM response cache disabled: {e}")
+                    return None
+    return _llm_cache
+
+def llm_cache_stats() -> Dict[str, Any]:
+    return _llm_cache.stats() if _llm_cache else {}
@@ -1,43 +1,278 @@
 # backend/app/core/config.py
 
-import itertools
+import re
+import time
+import random
+import asyncio
+import logging
+import threading
 
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_openai import ChatOpenAI
-from backend.app.utils.config import GOOGLE_API_KEYS, OPENAI_API_KEY
+from backend.app.core.key_scheduler import get_key_scheduler
+from backend.app.core.llm_cache import get_llm_cache, llm_cache_key
+from backend.app.utils.config import (
+    GOOGLE_API_KEYS,
+    OPENAI_API_KEY,
+    LLM_MAX_RETRIES,
+    LLM_RETRY_BASE_DELAY,
+    LLM_FALLBACK_MODEL,
+    LLM_HEDGE_REQUESTS,
+    LLM_HEDGE_DEFAULT_DELAY,
+    LLM_CACHE_ENABLED,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Long-lived chat clients shared by every MultiLLMs instance, keyed by
+# (provider, model, api_key, kwargs). Reusing a client reuses its HTTP
+# connection pool, so calls skip connection and TLS setup.
+_client_pool: Dict[Tuple, Any] = {}
+_client_pool_lock = threading.Lock()
+
+# Output tokens reserved per call when the request does not cap them
+DEFAULT_OUTPUT_TOKENS = 1024
+
+# Recent call latencies per model, used for the hedging delay
+_latencies: Dict[str, Deque[float]] = {}
+LATENCY_WINDOW = 200
+MIN_LATENCY_SAMPLES = 20
+
+def _pool_key(provider: str, model: str, api_key: str, kwargs: Dict[str, Any]) -> Tuple:
+    return (provider, model, api_key, tuple(sorted((k, repr(v)) for k, v in kwargs.items())))
+
+def get_pooled_client(provider: str, model: str, api_key: str, **kwargs) -> Any:
+    """
+    Return the shared client for (provider, model, api_key, kwargs), creating it on first use.
+    """
+    key = _pool_key(provider, model, api_key, kwargs)
+    client = _client_pool.get(key)
+    if client is not None:
+        return client
+
+    with _client_pool_lock:
+        client = _client_pool.get(key)
+        if client is None:
+            if provider == "google":
+                client = ChatGoogleGenerativeAI(model=model, api_key=api_key, **kwargs)
+            elif provider == "openai":
+                client = ChatOpenAI(model=model, api_key=api_key, **kwargs)
+            else:
+                raise ValueError(f"Unknown LLM provider: {provider}")
+            _client_pool[key] = client
+    return client
+
+def client_pool_size() -> int:
+    return len(_client_pool)
+
+def _prompt_text(prompt: Any) -> str:
+    return prompt.to_string() if hasattr(prompt, "to_string") else str(prompt)
+
+def _is_rate_limited(error: Exception) -> bool:
+    message = str(error).lower()
+    return "429" in message or "resourceexhausted" in type(error).__name__.lower() or "quota" in message or "rate limit" in message
+
+_TRANSIENT_ERROR_TYPES = (
+    "resourceexhausted", "toomanyrequests", "serviceunavailable", "internalservererror",
+    "deadlineexceeded", "gatewaytimeout", "badgateway", "timeout", "connectionerror", "apiconnectionerror",
+)
+_TRANSIENT_STATUS = re.compile(r"\b(429|500|502|503|504)\b")
+
+def _is_transient(error: Exception) -> bool:
+    """
+    Rate limits, timeouts, connection and 5xx errors, which another attempt may not hit.
+    Invalid arguments, oversized prompts, safety blocks and bad keys fail the same way every time.
+    """
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError, ConnectionError)) or _is_rate_limited(error):
+        return True
+    name = type(error).__name__.lower()
+    message = str(error).lower()
+    return (
+        any(transient in name for transient in _TRANSIENT_ERROR_TYPES)
+        or _TRANSIENT_STATUS.search(message) is not None
+        or "timed out" in message
+        or "unavailable" in message
+    )
+
+def _used_tokens(response: Any) -> Optional[int]:
+    usage = getattr(response, "usage_metadata", None)
+    return usage.get("total_tokens") if usage else None
+
+def _record_latency(model: str, seconds: float) -> None:
+    _latencies.setdefault(model, deque(maxlen=LATENCY_WINDOW)).append(seconds)
+
+def hedge_delay(model: str) -> float:
+    """
+    p95 of the recent latencies for model, or the configured default until enough calls were seen.
+    """
+    samples = sorted(_latencies.get(model, ()))
+    if len(samples) < MIN_LATENCY_SAMPLES:
+        return LLM_HEDGE_DEFAULT_DELAY
+    return samples[int(len(samples) * 0.95) - 1]
 
 class MultiLLMs:
     def __init__(self, api_keys=GOOGLE_API_KEYS, model="gemini-1.5-flash", **kwargs):
+        if isinstance(api_keys, str):
+            api_keys = [api_keys]
         self.api_keys = api_keys
         self.model = model
         self.kwargs = kwargs
-        self.key_selector = itertools.cycle(api_keys)
+        self.provider = "google" if model.startswith("gemini") else "openai"
+        # Only Google calls are spread over a key pool; OpenAI models use OPENAI_API_KEY directly
+        self.scheduler = get_key_scheduler(self.provider, api_keys) if self.provider == "google" and api_keys else None
 
-    def get_llm(self):
-        api_key = next(self.key_selector)
-        return ChatGoogleGenerativeAI(
-            model=self.model,
-            api_key=api_key,
-            **self.kwargs
-        )
+    def estimate_tokens(self, prompt: Any) -> int:
+        """
+        Rough token estimate (chars / 4) plus the output budget, reserved before the call.
+        """
+        output_tokens = self.kwargs.get("max_output_tokens") or self.kwargs.get("max_tokens") or DEFAULT_OUTPUT_TOKENS
+        return len(_prompt_text(prompt)) // 4 + output_tokens
+
+    def get_llm(self, api_key: Optional[str] = None):
+        if api_key is None:
+            api_key = self.scheduler.acquire_blocking()
+        return get_pooled_client("google", self.model, api_key, **self.kwargs)
 
     def get_llm_chatbot(self):
         api_key = OPENAI_API_KEY
-        return ChatOpenAI(
-            model=self.model,
-            api_key=api_key,
-            **self.kwargs
-        )
-
-    def invoke(self, prompt: str):
-        if GOOGLE_API_KEYS:
-            llm = self.get_llm()
-        else:
-            llm = self.get_llm_chatbot()
-        response = llm.invoke(prompt)
+        return get_pooled_client("openai", self.model, api_key, **self.kwargs)
+
+    def _settle(self, api_key: str, estimated: int, response: Any) -> None:
+        self.scheduler.settle(api_key, estimated, _used_tokens(response))
+
+    def _cache_lookup(self, prompt: Any, use_cache: bool):
+        """
+        Returns (cache, key, cached response); cache and key are None when caching is off.
+        """
+        cache = get_llm_cache() if use_cache and LLM_CACHE_ENABLED else None
+        if cache is None:
+            return None, None, None
+        key = llm_cache_key(self.model, _prompt_text(prompt), self.kwargs)
+        return cache, key, cache.get(key)
+
+    def invoke(self, prompt: str, use_cache: bool = True):
+        cache, key, response = self._cache_lookup(prompt, use_cache)
+        if response is None:
+            response = self._invoke_uncached(prompt)
+            if cache:
+                cache.set(key, self.model, response)
+        return response
+
+    def _invoke_uncached(self, prompt: str):
+        if self.scheduler is None:
+            return self.get_llm_chatbot().invoke(prompt)
+
+        estimated = self.estimate_tokens(prompt)
+        api_key = self.scheduler.acquire_blocking(estimated)
+        try:
+            response = self.get_llm(api_key).invoke(prompt)
+        except Exception as e:
+            if _is_rate_limited(e):
+                self.scheduler.penalize(api_key)
+            raise
+        self._settle(api_key, estimated, response)
+        return response
+
+    async def _call_google(self, prompt: Any, exclude: set) -> Any:
+        """
+        One call on the key with the most headroom; the key is added to exclude so a
+        retry or hedge goes to a different key when one is available.
+        """
+        estimated = self.estimate_tokens(prompt)
+        api_key = await self.scheduler.acquire(estimated, exclude=exclude)
+        exclude.add(api_key)
+        start_time = time.monotonic()
+        try:
+            response = await self.get_llm(api_key).ainvoke(prompt)
+        except Exception as e:
+            if _is_rate_limited(e):
+                self.scheduler.penalize(api_key)
+            raise
+        _record_latency(self.model, time.monotonic() - start_time)
+        self._settle(api_key, estimated, response)
+        return response
+
+    async def _call_hedged(self, prompt: Any, exclude: set) -> Any:
+        """
+        Send a duplicate call if the first one is still running after the p95 latency,
+        and return whichever succeeds first.
+        """
+        delay = hedge_delay(self.model)
+        primary = asyncio.ensure_future(self._call_google(prompt, exclude))
+        pending = {primary}
+        error = None
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return primary.result()
+
+            logger.info(f"Hedging slow {self.model} call after {delay:.1f}s")
+            pending.add(asyncio.ensure_future(self._call_google(prompt, exclude)))
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _call_fallback(self, prompt: Any) -> Any:
+        llm = get_pooled_client("openai", LLM_FALLBACK_MODEL, OPENAI_API_KEY)
+        return await llm.ainvoke(prompt)
+
+    async def ainvoke(self, prompt: str, hedge: Optional[bool] = None, use_cache: bool = True):
+        """
+        Cached call: identical (model, prompt, params) requests are answered from the
+        response cache unless use_cache is False.
+        """
+        # SQLite reads and writes run off the event loop
+        cache, key, response = await asyncio.to_thread(self._cache_lookup, prompt, use_cache)
+        if response is None:
+            response, answered_by = await self._ainvoke_uncached(prompt, hedge)
+            # A failover answer is not cached, or it would be served as this model's
+            if cache and answered_by == self.model:
+                await asyncio.to_thread(cache.set, key, self.model, response)
         return response
-    
-    async def ainvoke(self, prompt: str):
-        llm = self.get_llm()
-        response = await llm.ainvoke(prompt)
-        return response
\ No newline at end of file
+
+    async def _ainvoke_uncached(self, prompt: str, hedge: Optional[bool] = None) -> Tuple[Any, str]:
+        """
+        Call the model with exponential-backoff retries across keys, optional hedging,
+        and failover to OpenAI once the Google keys keep failing. Only transient errors
+        are retried; any other error is raised at once. Returns the response and the model that produced it.
+        """
+        if self.scheduler is None:
+            if self.provider == "openai":
+                return await self.get_llm_chatbot().ainvoke(prompt), self.model
+            return await self._call_fallback(prompt), LLM_FALLBACK_MODEL
+
+        hedge = LLM_HEDGE_REQUESTS if hedge is None else hedge
+        exclude: set = set()
+        error = None
+
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            if attempt:
+                delay = LLM_RETRY_BASE_DELAY * 2 ** (attempt - 1)
+                await asyncio.sleep(delay + random.uniform(0, delay / 2))
+            if len(exclude) >= len(self.scheduler.keys):
+                exclude.clear()
+            try:
+                if hedge:
+                    return await self._call_hedged(prompt, exclude), self.model
+                return await self._call_google(prompt, exclude), self.model
+            except Exception as e:
+                # Only transient errors are worth another attempt or a paid fallback call
+                if not _is_transient(e):
+                    raise
+                error = e
+                logger.warning(f"{self.model} call failed (attempt {attempt + 1}/{LLM_MAX_RETRIES + 1}): {e}")
+
+        if OPENAI_API_KEY:
+            logger.warning(f"Failing over to OpenAI {LLM_FALLBACK_MODEL}")
+            return await self._call_fallback(prompt), LLM_FALLBACK_MODEL
+        raise error
@@ -0,0 +1,63 @@
+# backend/app/transcript/benchmark.py
+
+import time
+import argparse
+
+from typing import List
+from backend.app.utils.ffmpeg_utils import get_audio_duration
+from backend.app.transcript.whisper_pool import load_model
+
+def benchmark_openai(audio_path: str, size: str, language: str) -> dict:
+    """
+    Time the fp32 openai-whisper engine, the current "Local Whisper" path.
+    """
+    start = time.time()
+    model = load_model("openai", size)
+    load_seconds = time.time() - start
+
+    start = time.time()
+    model.transcribe(audio_path, language=language)
+    return {"engine": "openai fp32", "threads": "-", "beam": "greedy", "load": load_seconds, "wall": time.time() - start}
+
+def benchmark_faster(audio_path: str, size: str, language: str, cpu_threads: int, beam_size: int) -> dict:
+    """
+    Time the int8 faster-whisper engine, the "Faster Whisper" path.
+    """
+    start = time.time()
+    model = load_model("faster", size, cpu_threads=cpu_threads)
+    load_seconds = time.time() - start
+
+    start = time.time()
+    segments, _ = model.transcribe(audio_path, language=language, beam_size=beam_size)
+    list(segments)  # decoding is lazy, consume it to measure the full run
+    return {"engine": "faster int8", "threads": cpu_threads or "auto", "beam": beam_size, "load": load_seconds, "wall": time.time() - start}
+
+def run_benchmark(audio_path: str, size: str, language: str, threads: List[int], beams: List[int]) -> None:
+    """
+    Compare real-time factor (transcription wall time / audio duration) of both engines on the same audio.
+    """
+    duration = get_audio_duration(audio_path)
+    print(f"Audio: {audio_path} ({duration:.1f}s), model: {size}")
+
+    results = [benchmark_openai(audio_path, size, language)]
+    for cpu_threads in threads:
+        for beam_size in beams:
+            results.append(benchmark_faster(audio_path, size, language, cpu_threads, beam_size))
+
+    print(f"{'engine':<12} {'threads':>7} {'beam':>6} {'load s':>7} {'wall s':>8} {'RTF':>6}")
+    for result in results:
+        print(
+            f"{result['engine']:<12} {str(result['threads']):>7} {str(result['beam']):>6} "
+            f"{result['load']:>7.1f} {result['wall']:>8.1f} {result['wall'] / duration:>6.2f}"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark local Whisper engines on CPU.")
+    parser.add_argument("audio_path", help="Audio file to transcribe")
+    parser.add_argument("--model", default="base", help="Model size (e.g., base, small, medium)")
+    parser.add_argument("--language", default="en", help="Language code")
+    parser.add_argument("--threads", type=int, nargs="+", default=[0], help="faster-whisper cpu_threads values to try")
+    parser.add_argument("--beams", type=int, nargs="+", default=[1, 5], help="faster-whisper beam sizes to try")
+    args = parser.parse_args()
+
+    run_benchmark(args.audio_path, args.model, args.language, args.threads, args.beams)
@@ -0,0 +1,242 @@
+# backend/app/transcript/cache.py
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+
+from datetime import datetime
+from typing import Dict, Optional
+from backend.app.transcript.segments import SegmentStore
+from backend.app.utils.config import (
+    DEFAULT_CONFIG,
+    OUTPUT_DIR_TRANSCRIPTS,
+    TRANSCRIPT_CACHE_MAX_ENTRIES,
+    TRANSCRIPT_CACHE_MAX_MB,
+    TRANSCRIPT_CACHE_MAX_AGE_DAYS,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CACHE_COLLECTION_NAME = "transcript_cache"
+
+def file_sha256(path: str, block_size: int = 1 << 20) -> str:
+    """
+    Hash a file's content so uploads of the same media share a cache entry.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def transcript_cache_key(config: Dict) -> Optional[str]:
+    """
+    Build the cache key for a transcript request from (source id, language, method, model),
+    where method and model include every option that changes the output.
+    Returns None when the source cannot be identified.
+    """
+    from backend.app.transcript.sources.youtube import get_youtube_id
+
+    source_type = config.get("type_of_source")
+    source = config.get("source_url_or_path", "")
+
+    try:
+        if source_type == "YouTube Video":
+            source_id = f"youtube:{get_youtube_id(source)}"
+        elif os.path.isfile(source):
+            source_id = f"file:{file_sha256(source)}"
+        else:
+            return None
+    except Exception:
+        return None
+
+    if source_type == "YouTube Video" and config.get("use_youtube_captions", True):
+        method, model = "YouTube Captions", ""
+    else:
+        method = config.get("transcription_method", "Cloud Whisper")
+        model = config.get("whisper_model", "base") if method in ("Local Whisper", "Faster Whisper") else "whisper-large-v3"
+        if method == "Faster Whisper":
+            model += f"+beam{config.get('beam_size', DEFAULT_CONFIG['beam_size'])}"
+        if config.get("vad_filter"):
+            method += "+VAD"
+        # Fixed-length streamed segments cut words at their edges, so they are cached apart
+        if config.get("streaming_pipeline", DEFAULT_CONFIG["streaming_pipeline"]):
+            method += f"+stream{config.get('stream_segment_seconds', DEFAULT_CONFIG['stream_segment_seconds'])}"
+
+    raw_key = "|".join([source_id, config.get("language") or "", method, model])
+    return hashlib.sha256(raw_key.encode("utf-8")).hexdigest()
+
+class DiskTranscriptCache:
+    """
+    Disk tier: one JSON file per key under OUTPUT_DIR_TRANSCRIPTS.
+    File mtime is bumped on every hit, so eviction drops the least recently used entries first.
+    """
+    def __init__(
+        self,
+        cache_dir: str = OUTPUT_DIR_TRANSCRIPTS,
+        max_entries: int = TRANSCRIPT_CACHE_MAX_ENTRIES,
+        max_mb: int = TRANSCRIPT_CACHE_MAX_MB,
+        max_age_days: int = TRANSCRIPT_CACHE_MAX_AGE_DAYS
+    ):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_mb * 1024 * 1024
+        self.max_age_seconds = max_age_days * 86400
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict]:
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age_seconds:
+                os.remove(path)
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(path, None)
+            return entry["segments"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def set(self, key: str, segments: Dict, metadata: Dict) -> None:
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"segments": segments, "metadata": metadata}, f, ensure_ascii=False)
+        # Atomic rename so concurrent readers never see a partial file
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self) -> None:
+        """
+        Drop expired entries, then the least recently used ones until size and count limits hold.
+        """
+        with self._lock:
+            now = time.time()
+            entries = []
+            for entry in os.scandir(self.cache_dir):
+                if not entry.name.endswith(".json"):
+                    continue
+                stat = entry.stat()
+                if now - stat.st_mtime > self.max_age_seconds:
+                    os.remove(entry.path)
+                else:
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+            entries.sort()
+            total_bytes = sum(size for _, size, _ in entries)
+            while entries and (len(entries) > self.max_entries or total_bytes > self.max_bytes):
+                _, size, path = entries.pop(0)
+                os.remove(path)
+                total_bytes -= size
+
+class MongoTranscriptCache:
+    """
+    Mongo tier: shared across workers. A TTL index handles age eviction,
+    and the oldest entries are trimmed when the collection outgrows max_entries.
+    """
+    def __init__(
+        self,
+        max_entries: int = TRANSCRIPT_CACHE_MAX_ENTRIES,
+        max_age_days: int = TRANSCRIPT_CACHE_MAX_AGE_DAYS
+    ):
+        from pymongo import MongoClient, ASCENDING
+        from backend.app.api.db import MONGODB_URL, DB_NAME
+
+        self.max_entries = max_entries
+        client = MongoClient(MONGODB_URL, serverSelectionTimeoutMS=500)
+        self.collection = client[DB_NAME][CACHE_COLLECTION_NAME]
+        self.collection.create_index([("key", ASCENDING)], unique=True)
+        self.collection.create_index("last_accessed", expireAfterSeconds=max_age_days * 86400)
+
+    def get(self, key: str) -> Optional[Dict]:
+        entry = self.collection.find_one_and_update(
+            {"key": key},
+            {"$set": {"last_accessed": datetime.now()}},
+            projection={"segments": 1}
+        )
+        return entry.get("segments") if entry else None
+
+    def set(self, key: str, segments: Dict, metadata: Dict) -> None:
+        self.collection.update_one(
+            {"key": key},
+            {"$set": {"segments": segments, "metadata": metadata, "last_accessed": datetime.now()}},
+            upsert=True
+        )
+        excess = self.collection.estimated_document_count() - self.max_entries
+        if excess > 0:
+            stale = self.collection.find({}, {"_id": 1}).sort("last_accessed", 1).limit(excess)
+            self.collection.delete_many({"_id": {"$in": [doc["_id"] for doc in stale]}})
+
+class TranscriptCache:
+    """
+    Two-tier transcript cache: local disk first, then Mongo.
+    Mongo hits are copied back to disk. A tier that fails is logged and skipped.
+    """
+    def __init__(self):
+        self.disk = DiskTranscriptCache()
+        try:
+            self.mongo = MongoTranscriptCache()
+        except Exception as e:
+            logger.warning(f"Mongo transcript cache disabled: {e}")
+            self.mongo = None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[SegmentStore]:
+        segments = self.disk.get(key)
+        if segments is None and self.mongo:
+            try:
+                segments = self.mongo.get(key)
+            except Exception as e:
+                logger.warning(f"Mongo transcript cache lookup failed: {e}")
+            if segments is not None:
+                try:
+                    self.disk.set(key, segments, {})
+                except OSError as e:
+                    logger.warning(f"Disk transcript cache write-back failed: {e}")
+
+        if segments is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return SegmentStore.from_dict(segments)
+
+    def set(self, key: str, segments: SegmentStore, config: Dict) -> None:
+        metadata = {
+            "source_url_or_path": config.get("source_url_or_path"),
+            "language": config.get("language"),
+            "transcription_method": config.get("transcription_method"),
+            "created_at": datetime.now().isoformat(),
+        }
+        data = segments.to_dict()
+        try:
+            self.disk.set(key, data, metadata)
+        except OSError as e:
+            logger.warning(f"Disk transcript cache write failed: {e}")
+        if self.mongo:
+            try:
+                self.mongo.set(key, data, metadata)
+            except Exception as e:
+                logger.warning(f"Mongo transcript cache write failed: {e}")
+
+_transcript_cache: Optional[TranscriptCache] = None
+_cache_lock = threading.Lock()
+
+def get_transcript_cache() -> TranscriptCache:
+    """
+    Lazily create the process-wide transcript cache.
+    """
+    global _transcript_cache
+    if _transcript_cache is None:
+        with _cache_lock:
+            if _transcript_cache is None:
+                _transcript_cache = TranscriptCache()
+    return _transcript_cache
@@ -0,0 +1,144 @@
+# backend/app/transcript/segments.py
+
+import re
+
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from backend.app.utils.formatting import format_time
+
+_TIMESTAMP_LINE = re.compile(r'(\d{2}):(\d{2}):(\d{2})\s+(.*?)(?=\n\d{2}:\d{2}:\d{2}|\Z)', re.DOTALL)
+
+class SegmentStore:
+    """
+    Compact transcript representation: parallel arrays of start/end seconds and
+    character offsets into one concatenated text buffer.
+    Segment i's text is text[offsets[i]:offsets[i + 1]].
+    """
+    def __init__(self):
+        self.starts = array('d')
+        self.ends = array('d')
+        self.offsets = array('q', [0])
+        self._parts: List[str] = []
+        self._text: Optional[str] = ""
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = "".join(self._parts)
+            self._parts = [self._text]
+        return self._text
+
+    def append(self, start: float, end: float, text: str) -> None:
+        text = " ".join(text.split())
+        if not text:
+            return
+        self.starts.append(start)
+        self.ends.append(max(start, end))
+        self._parts.append(text)
+        self._text = None
+        self.offsets.append(self.offsets[-1] + len(text))
+
+    def extend(self, segments: Iterable[Dict[str, Any]], offset: float = 0.0) -> None:
+        """
+        Append Whisper-style segment dicts ({"start", "end", "text"}), shifted by offset seconds.
+        """
+        for segment in segments:
+            start = segment["start"] + offset
+            self.append(start, segment.get("end", segment["start"]) + offset, segment["text"])
+
+    def merge(self, other: "SegmentStore") -> None:
+        for i in range(len(other)):
+            self.append(other.starts[i], other.ends[i], other.text_at(i))
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def text_at(self, i: int) -> str:
+        return self.text[self.offsets[i]:self.offsets[i + 1]]
+
+    def timestamp_at(self, i: int) -> str:
+        return format_time(self.starts[i])
+
+    def __iter__(self) -> Iterator[Tuple[float, float, str]]:
+        text = self.text
+        for i in range(len(self)):
+            yield self.starts[i], self.ends[i], text[self.offsets[i]:self.offsets[i + 1]]
+
+    def line_at(self, i: int) -> str:
+        return f"{self.timestamp_at(i)} {self.text_at(i)}"
+
+    def to_transcript(self, start: int = 0, end: Optional[int] = None) -> str:
+        """
+        Render segments [start, end) as "HH:MM:SS text" lines.
+        """
+        end = len(self) if end is None else end
+        return "".join(f"{self.line_at(i)}\n" for i in range(start, end))
+
+    def sentences(self, min_length: int = 6) -> List[Dict[str, str]]:
+        """
+        Segments as {"timestamp", "sentence"} dicts, skipping very short ones.
+        """
+        return [
+            {"timestamp": self.timestamp_at(i), "sentence": self.text_at(i)}
+            for i in range(len(self))
+            if self.offsets[i + 1] - self.offsets[i] >= min_length
+        ]
+
+    def to_dict(self, include_text: bool = True) -> Dict[str, Any]:
+        """
+        Serializable form. Without include_text only the arrays are kept, for records
+        that already store the rendered transcript the text can be rebuilt from.
+        """
+        data = {
+            "starts": self.starts.tolist(),
+            "ends": self.ends.tolist(),
+            "offsets": self.offsets.tolist(),
+        }
+        if include_text:
+            data["text"] = self.text
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], transcript: Optional[str] = None) -> "SegmentStore":
+        """
+        Inverse of to_dict; without a stored text buffer it is rebuilt from the
+        transcript rendered by to_transcript (one "HH:MM:SS text" line per segment).
+        """
+        text = data.get("text")
+        if text is None:
+            if transcript is None:
+                raise ValueError("Segment data without text needs the transcript")
+            # Segment texts are whitespace-normalized, so each line holds exactly one segment
+            text = "".join(line.split(" ", 1)[1] if " " in line else "" for line in transcript.splitlines())
+            if len(text) != data["offsets"][-1]:
+                raise ValueError("Transcript does not match the stored segment offsets")
+
+        store = cls()
+        store.starts = array('d', data["starts"])
+        store.ends = array('d', data["ends"])
+        store.offsets = array('q', data["offsets"])
+        store._parts = [text]
+        store._text = text
+        return store
+
+    @classmethod
+    def from_segments(cls, segments: Iterable[Dict[str, Any]], offset: float = 0.0) -> "SegmentStore":
+        store = cls()
+        store.extend(segments, offset)
+        return store
+
+    @classmethod
+    def from_transcript(cls, transcript: str) -> "SegmentStore":
+        """
+        Parse a legacy "HH:MM:SS text" transcript, for records saved before segments were stored.
+        Each segment ends where the next one starts.
+        """
+        matches = [
+            (int(h) * 3600 + int(m) * 60 + int(s), text)
+            for h, m, s, text in _TIMESTAMP_LINE.findall(transcript)
+        ]
+        store = cls()
+        for i, (start, text) in enumerate(matches):
+            end = matches[i + 1][0] if i + 1 < len(matches) else start
+            store.append(float(start), float(end), text)
+        return store
@@ -1,16 +1,31 @@
 # backend/app/transcript/sources/audio_base.py
 
 import os
+import shutil
 import tempfile
-from typing import Optional
+from typing import Iterator, Optional, Tuple
 
 class AudioSourceHandler:
     """
     Abstract base class for audio source handlers.
+    Each handler owns a private scratch directory for its job, so concurrent
+    jobs never share temp file names. Use it as a context manager to guarantee cleanup.
     """
     def __init__(self, source_path: str, temp_dir: Optional[str] = None):
         self.source_path = source_path
-        self.temp_dir = temp_dir or tempfile.gettempdir()
+        self.temp_dir = tempfile.mkdtemp(prefix="audio_job_", dir=temp_dir)
+
+    def __enter__(self) -> "AudioSourceHandler":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def job_path(self, filename: str) -> str:
+        """
+        Returns a path inside this job's scratch directory.
+        """
+        return os.path.join(self.temp_dir, filename)
         
     def get_processed_audio(self) -> str:
         """
@@ -18,6 +33,13 @@ class AudioSourceHandler:
         """
         raise NotImplementedError("This method must be implemented by subclasses.")
 
+    def stream_processed_audio(self, segment_seconds: float = 300) -> Iterator[Tuple[str, float]]:
+        """
+        Yields (segment_path, offset_seconds) pairs as processed audio becomes available.
+        Handlers that can segment while reading override this; the default yields the whole file.
+        """
+        yield self.get_processed_audio(), 0.0
+
     def clean_up(self, file_path: str) -> None:
         """
         Cleans up a temporary file if it exists.
@@ -27,3 +49,9 @@ class AudioSourceHandler:
                 os.remove(file_path)
             except OSError as e:
                 print(f"Error deleting file {file_path}: {e}")
+
+    def close(self) -> None:
+        """
+        Removes the job's scratch directory and everything in it.
+        """
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
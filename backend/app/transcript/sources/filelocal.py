@@ -1,26 +1,30 @@
 # backend/app/transcript/sources/filelocal.py
 
 import os
+from typing import Iterator, Tuple
 from backend.app.transcript.sources.audio_base import AudioSourceHandler
-from backend.app.utils.ffmpeg_utils import convert_to_wav, process_audio_file
+from backend.app.utils.ffmpeg_utils import transcode_audio, stream_segments
 
 class LocalAudioHandler(AudioSourceHandler):
     """
     Handles local audio files.
     """
-    def get_processed_audio(self) -> str:
+    def validate_source(self) -> None:
         if not os.path.exists(self.source_path):
             raise FileNotFoundError(f"Cannot find local file: {self.source_path}")
         
         if not self.source_path.lower().endswith(('.mp4', '.mkv', '.avi', '.mov', '.mp3', '.wav')):
             raise ValueError("Unsupported file format. Supported formats: mp4, mkv, avi, mov, mp3, wav")
 
-        temp_wav = os.path.join(self.temp_dir, "local_audio.wav")
-        convert_to_wav(self.source_path, temp_wav)
-        
-        processed_path = os.path.join(self.temp_dir, "local_processed.mp3")
-        process_audio_file(temp_wav, processed_path)
-        
-        self.clean_up(temp_wav)
+    def get_processed_audio(self) -> str:
+        self.validate_source()
+
+        # Extract and encode in one ffmpeg pass, no intermediate WAV
+        processed_path = self.job_path("local_processed.mp3")
+        transcode_audio(self.source_path, processed_path)
+
+        return processed_path
 
-        return processed_path
\ No newline at end of file
+    def stream_processed_audio(self, segment_seconds: float = 300) -> Iterator[Tuple[str, float]]:
+        self.validate_source()
+        yield from stream_segments(self.source_path, self.temp_dir, segment_seconds)
@@ -3,10 +3,11 @@
 import os
 import re
 import tempfile
+from typing import Iterator, Optional, Tuple
 import pytubefix as pytube
 from youtube_transcript_api import YouTubeTranscriptApi
-from backend.app.utils.formatting import format_time
-from backend.app.utils.ffmpeg_utils import process_audio_file
+from backend.app.transcript.segments import SegmentStore
+from backend.app.utils.ffmpeg_utils import transcode_audio, stream_segments
 from backend.app.transcript.sources.audio_base import AudioSourceHandler
 
 def get_youtube_id(url: str) -> str:
@@ -21,9 +22,9 @@ def get_youtube_id(url: str) -> str:
     
     return match.group(1)
 
-def get_youtube_transcript(video_id: str, language: str = "en") -> str:
+def get_youtube_segments(video_id: str, language: str = "en") -> SegmentStore:
     """
-    Get transcript from YouTube subtitles.
+    Get transcript segments from YouTube subtitles.
     """
     try:
         if language == "auto":
@@ -34,25 +35,26 @@ def get_youtube_transcript(video_id: str, language: str = "en") -> str:
             languages=[language]
         )
 
-        return "\n".join(f"{format_time(entry['start'])} {entry['text'].strip()}" for entry in transcript_list)
+        return SegmentStore.from_segments(
+            {"start": entry["start"], "end": entry["start"] + entry.get("duration", 0.0), "text": entry["text"]}
+            for entry in transcript_list
+        )
     except Exception as e:
         raise Exception(f"Cannot get YouTube transcript. Error: {e}")
 
-def download_youtube_audio(url: str) -> str:
+def download_youtube_audio(url: str, output_dir: Optional[str] = None) -> str:
     """
     Download audio from YouTube video and process it.
+    ffmpeg reads the audio stream URL directly, so the MP4 is never written to disk.
     """
     try:
         yt = pytube.YouTube(url)
         stream = yt.streams.get_audio_only()
         
-        temp_dir = tempfile.gettempdir()
-        temp_path = os.path.join(temp_dir, "yt_audio.mp4")
+        temp_dir = output_dir or tempfile.gettempdir()
         processed_path = os.path.join(temp_dir, "yt_audio_processed.mp3")
         
-        stream.download(output_path=temp_dir, filename="yt_audio.mp4")
-        process_audio_file(temp_path, processed_path)
-        os.remove(temp_path)
+        transcode_audio(stream.url, processed_path)
         
         return processed_path
     except Exception as e:
@@ -69,4 +71,18 @@ class YouTubeAudioHandler(AudioSourceHandler):
         if not self.source_path:
             raise ValueError("YouTube source path is required")
         
-        return download_youtube_audio(self.source_path)
\ No newline at end of file
+        return download_youtube_audio(self.source_path, self.temp_dir)
+
+    def stream_processed_audio(self, segment_seconds: float = 300) -> Iterator[Tuple[str, float]]:
+        """
+        Yields audio segments while the YouTube stream is still downloading.
+        """
+        if not self.source_path:
+            raise ValueError("YouTube source path is required")
+
+        try:
+            stream = pytube.YouTube(self.source_path).streams.get_audio_only()
+        except Exception as e:
+            raise Exception(f"Cannot download YouTube audio: {e}")
+
+        yield from stream_segments(stream.url, self.temp_dir, segment_seconds)
@@ -1,11 +1,26 @@
 # backend/app/transcript/transcription.py
 
-import os
-from backend.app.transcript.whisper import transcribe_audio
+import logging
+import threading
+from typing import Callable, Optional
+from backend.app.transcript.whisper import transcribe_audio, transcribe_segments
+from backend.app.transcript.cache import get_transcript_cache, transcript_cache_key
 from backend.app.transcript.sources.audio_base import AudioSourceHandler
 from backend.app.transcript.sources.filelocal import LocalAudioHandler
 from backend.app.transcript.sources.youtube import YouTubeAudioHandler
-from backend.app.transcript.sources.youtube import get_youtube_id, get_youtube_transcript
+from backend.app.transcript.sources.youtube import get_youtube_id, get_youtube_segments
+from backend.app.transcript.segments import SegmentStore
+from backend.app.utils.config import DEFAULT_CONFIG, MAX_CONCURRENT_TRANSCRIPTIONS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_job_slots = threading.BoundedSemaphore(MAX_CONCURRENT_TRANSCRIPTIONS)
+
+ProgressCallback = Callable[[str, float], None]
+
+def _noop_progress(stage: str, progress: float) -> None:
+    pass
 
 
 def get_source_type(source_type: str, source_path: str) -> AudioSourceHandler:
@@ -27,41 +42,78 @@ def get_source_type(source_type: str, source_path: str) -> AudioSourceHandler:
     return type_class(source_path)
 
 
-def get_transcript(config: dict) -> str:
+def get_transcript_segments(config: dict, on_progress: Optional[ProgressCallback] = None) -> SegmentStore:
     """
-    Get transcript from video source.
+    Get transcript segments from video source, served from the transcript cache when possible.
+    on_progress is called with (stage, fraction done) as the pipeline advances.
     """
+    on_progress = on_progress or _noop_progress
     source_type = config.get("type_of_source")
     source_path = config.get("source_url_or_path")
     
     if not source_type or not source_path:
         raise ValueError("Type of source and source URL/path are required")
-    
+
+    on_progress("checking_cache", 0.0)
+    cache_key = transcript_cache_key(config) if config.get("use_cache", True) else None
+    if cache_key:
+        cached = get_transcript_cache().get(cache_key)
+        if cached is not None:
+            logger.info(f"Transcript cache hit: {cache_key[:12]}")
+            return cached
+
+    captions_requested = config.get("use_youtube_captions", True)
+    segments = _get_transcript_uncached(config, on_progress)
+
+    # A failed caption fetch falls back to Whisper and clears use_youtube_captions,
+    # so the result is stored under the Whisper key, not the captions key
+    if cache_key and config.get("use_youtube_captions", True) != captions_requested:
+        cache_key = transcript_cache_key(config)
+    if cache_key:
+        get_transcript_cache().set(cache_key, segments, config)
+    return segments
+
+
+def _get_transcript_uncached(config: dict, on_progress: ProgressCallback) -> SegmentStore:
+    """
+    Download or read the source and transcribe it.
+    """
+    source_type = config.get("type_of_source")
+    source_path = config.get("source_url_or_path")
+
     if source_type == "YouTube Video":
         try:
             if config.get("use_youtube_captions", True):
+                on_progress("fetching_captions", 0.1)
                 video_id = get_youtube_id(source_path)
-                return get_youtube_transcript(video_id, config.get("language")) # "en"
+                return get_youtube_segments(video_id, config.get("language")) # "en"
         except Exception as e:
             config["use_youtube_captions"] = False
 
-        audio_path = get_source_type(source_type, source_path).get_processed_audio()
-
-        try:
-            return transcribe_audio(audio_path, config)
-        finally:
-            if os.path.exists(audio_path):
-                os.remove(audio_path)
+        return _transcribe_source(source_type, source_path, config, on_progress)
     else:
         try:
-            source_audio = get_source_type(source_type, source_path)
-            audio_path = source_audio.get_processed_audio()
-
-            try:
-                return transcribe_audio(audio_path, config)
-            finally:
-                if os.path.exists(audio_path):
-                    os.remove(audio_path)
+            return _transcribe_source(source_type, source_path, config, on_progress)
         except Exception as e:
             raise Exception(f"Error processing audio source: {e}")
 
+
+def _transcribe_source(source_type: str, source_path: str, config: dict, on_progress: ProgressCallback) -> SegmentStore:
+    """
+    Process and transcribe audio inside the handler's own scratch directory.
+    At most MAX_CONCURRENT_TRANSCRIPTIONS jobs hold a slot at the same time.
+    """
+    on_progress("waiting_for_slot", 0.1)
+    with _job_slots:
+        with get_source_type(source_type, source_path) as source_audio:
+            if config.get("streaming_pipeline", DEFAULT_CONFIG["streaming_pipeline"]):
+                # Opt-in: fixed-length segments are transcribed while the rest of the audio is
+                # still being read, at the cost of cutting words at segment boundaries
+                on_progress("streaming_transcription", 0.2)
+                segment_seconds = config.get("stream_segment_seconds", DEFAULT_CONFIG["stream_segment_seconds"])
+                return transcribe_segments(source_audio.stream_processed_audio(segment_seconds), config)
+
+            on_progress("processing_audio", 0.2)
+            audio_path = source_audio.get_processed_audio()
+            on_progress("transcribing", 0.5)
+            return transcribe_audio(audio_path, config)
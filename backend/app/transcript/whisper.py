@@ -1,43 +1,139 @@
 # backend/app/transcript/sources/whisper.py
 
-from typing import Dict
-from backend.app.utils.formatting import format_time
-from backend.app.utils.config import DEFAULT_CONFIG, get_api_key
+import os
+import shutil
+import tempfile
 
-def transcribe_audio(audio_path: str, config: Dict) -> str:
+from typing import Callable, Dict, Iterable, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from backend.app.transcript.segments import SegmentStore
+from backend.app.utils.ffmpeg_utils import split_audio_at_silences, trim_silence, map_to_original
+from backend.app.transcript.whisper_pool import whisper_pool
+from backend.app.utils.config import (
+    DEFAULT_CONFIG,
+    GROQ_API_KEYS,
+    GROQ_MAX_UPLOAD_MB,
+    WHISPER_MODEL_REPLICAS,
+    get_api_key,
+)
+
+def transcribe_audio(audio_path: str, config: Dict) -> SegmentStore:
     """
     Transcribe audio file using Whisper (Cloud or Local).
     """
     method = config.get("transcription_method", "Cloud Whisper")
     language = config.get("language", None)
+    vad = config.get("vad_filter", DEFAULT_CONFIG["vad_filter"])
 
     try:
         if (method == "Cloud Whisper"):
-            return _transcribe_with_groq(audio_path, language)
+            if config.get("chunked_transcription", DEFAULT_CONFIG["chunked_transcription"]):
+                chunk_seconds = config.get("audio_chunk_seconds", DEFAULT_CONFIG["audio_chunk_seconds"])
+                return _transcribe_with_groq_chunked(audio_path, language, chunk_seconds, vad)
+            return _transcribe_with_groq(audio_path, language, vad)
         elif (method == "Local Whisper"):
-            return _transcribe_with_local_whisper(audio_path, language)
+            model_size = config.get("whisper_model", DEFAULT_CONFIG["whisper_model"])
+            return _transcribe_with_local_whisper(audio_path, language, model_size, vad)
+        elif (method == "Faster Whisper"):
+            model_size = config.get("whisper_model", DEFAULT_CONFIG["whisper_model"])
+            beam_size = config.get("beam_size", DEFAULT_CONFIG["beam_size"])
+            return _transcribe_with_faster_whisper(audio_path, language, model_size, beam_size, vad)
         else:
             raise ValueError(f"Unknown transcription method: {method}")
     except Exception as e:
         raise Exception(f"Transcription error: {e}")
 
 
-def _transcribe_with_groq(audio_path: str, language: str = "en") -> str:
+def transcribe_segments(segments: Iterable[Tuple[str, float]], config: Dict) -> SegmentStore:
     """
-    Using Groq API for transcription.
+    Transcribe (segment_path, offset) pairs as they arrive from a producer.
+    Each segment is handed to a worker the moment it is yielded, so transcription
+    overlaps with download and transcoding. Results are merged in segment order.
+    """
+    method = config.get("transcription_method", "Cloud Whisper")
+    language = config.get("language", None)
+    vad = config.get("vad_filter", DEFAULT_CONFIG["vad_filter"])
+
+    if method == "Cloud Whisper":
+        keys = GROQ_API_KEYS or [get_api_key(DEFAULT_CONFIG, "GROQ_API_KEY")]
+        max_workers = len(keys)
+
+        def transcribe_segment(index: int, path: str) -> List[Dict]:
+            return _speech_segments(path, lambda p: _groq_segments(p, language, keys[index % len(keys)]), vad)
+    elif method == "Local Whisper":
+        model_size = config.get("whisper_model", DEFAULT_CONFIG["whisper_model"])
+        max_workers = WHISPER_MODEL_REPLICAS
+
+        def transcribe_segment(index: int, path: str) -> List[Dict]:
+            return _speech_segments(path, lambda p: _local_whisper_segments(p, language, model_size), vad)
+    elif method == "Faster Whisper":
+        model_size = config.get("whisper_model", DEFAULT_CONFIG["whisper_model"])
+        beam_size = config.get("beam_size", DEFAULT_CONFIG["beam_size"])
+        max_workers = WHISPER_MODEL_REPLICAS
+
+        def transcribe_segment(index: int, path: str) -> List[Dict]:
+            return _speech_segments(path, lambda p: _faster_whisper_segments(p, language, model_size, beam_size), vad)
+    else:
+        raise ValueError(f"Unknown transcription method: {method}")
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                (executor.submit(transcribe_segment, index, path), offset)
+                for index, (path, offset) in enumerate(segments)
+            ]
+            store = SegmentStore()
+            for future, offset in futures:
+                store.extend(future.result(), offset)
+            return store
+    except Exception as e:
+        raise Exception(f"Transcription error: {e}")
+
+def _speech_segments(audio_path: str, transcribe: Callable[[str], List[Dict]], vad: bool) -> List[Dict]:
+    """
+    Run transcribe on the audio, or on a speech-only copy of it when vad is set.
+    With VAD, segment times are mapped back to the untrimmed audio's timeline.
+    """
+    if not vad:
+        return transcribe(audio_path)
+
+    base, _ = os.path.splitext(audio_path)
+    speech_path = f"{base}_speech.mp3"
+    try:
+        offset_map = trim_silence(audio_path, speech_path)
+        if not offset_map:
+            return []
+
+        segments = transcribe(speech_path)
+        return [
+            {
+                **segment,
+                "start": map_to_original(segment["start"], offset_map),
+                "end": map_to_original(segment["end"], offset_map),
+            }
+            for segment in segments
+        ]
+    finally:
+        if os.path.exists(speech_path):
+            os.remove(speech_path)
+
+def _groq_segments(audio_path: str, language: str, api_key: str) -> List[Dict]:
+    """
+    Send a single audio file to the Groq API and return its segments.
+    Every upload path goes through here, so the size limit is checked per file.
     """
     try:
         from groq import Groq
     except ImportError:
         raise ImportError("Please install 'groq' to use Cloud Whisper.")
 
-    api_key = get_api_key(DEFAULT_CONFIG, "GROQ_API_KEY")
+    size_mb = os.path.getsize(audio_path) / (1024 * 1024)
+    if size_mb > GROQ_MAX_UPLOAD_MB:
+        raise ValueError(f"Audio segment is {size_mb:.1f} MB, above the {GROQ_MAX_UPLOAD_MB} MB upload limit. Lower 'audio_chunk_seconds' or 'stream_segment_seconds'.")
 
     groq_client = Groq(api_key=api_key)
-    
-    with open(audio_path, "rb") as audio_file:
-        print("\nStarting transcription with Groq API...")
 
+    with open(audio_path, "rb") as audio_file:
         response = groq_client.audio.transcriptions.create(
             file=audio_file,
             model="whisper-large-v3",
@@ -46,34 +142,90 @@ def _transcribe_with_groq(audio_path: str, language: str = "en") -> str:
             temperature=0.0
         )
 
-        transcript = ""
-        if hasattr(response, "segments"): # Check if response has segments attribute
-            for segment in response.segments:
-                timestamp = format_time(segment['start'])
-                transcript += f"{timestamp} {segment['text'].strip()}\n"
-        else:
-            raise ValueError("Unexpected response format from Groq API")
+    if not hasattr(response, "segments"): # Check if response has segments attribute
+        raise ValueError("Unexpected response format from Groq API")
+
+    return response.segments
+
+def _transcribe_with_groq(audio_path: str, language: str = "en", vad: bool = False) -> SegmentStore:
+    """
+    Using Groq API for transcription.
+    """
+    api_key = get_api_key(DEFAULT_CONFIG, "GROQ_API_KEY")
+
+    print("\nStarting transcription with Groq API...")
+    segments = _speech_segments(audio_path, lambda p: _groq_segments(p, language, api_key), vad)
+
+    return SegmentStore.from_segments(segments)
+
+def _transcribe_with_groq_chunked(audio_path: str, language: str = "en", chunk_seconds: float = 600, vad: bool = False) -> SegmentStore:
+    """
+    Using Groq API for transcription, splitting long audio at silences and
+    transcribing the chunks concurrently, one worker per API key.
+    """
+    keys = GROQ_API_KEYS or [get_api_key(DEFAULT_CONFIG, "GROQ_API_KEY")]
+    size_mb = os.path.getsize(audio_path) / (1024 * 1024)
 
-        return transcript
+    # Keep chunks next to the source audio, inside the job's scratch directory
+    chunk_dir = tempfile.mkdtemp(prefix="groq_chunks_", dir=os.path.dirname(audio_path) or None)
+    try:
+        chunks = split_audio_at_silences(audio_path, chunk_dir, max_chunk_seconds=chunk_seconds)
+        if len(chunks) == 1 and size_mb > GROQ_MAX_UPLOAD_MB:
+            raise ValueError(f"Audio file is {size_mb:.1f} MB, above the {GROQ_MAX_UPLOAD_MB} MB upload limit. Lower 'audio_chunk_seconds'.")
+
+        print(f"\nStarting chunked transcription with Groq API: {len(chunks)} chunks, {len(keys)} keys...")
+        return transcribe_segments(chunks, {"transcription_method": "Cloud Whisper", "language": language, "vad_filter": vad})
+    finally:
+        shutil.rmtree(chunk_dir, ignore_errors=True)
 
-def _transcribe_with_local_whisper(audio_path: str, language: str = None) -> str:
+def _transcribe_with_local_whisper(audio_path: str, language: str = None, model_size: str = "base", vad: bool = False) -> SegmentStore:
     """
-    Using local Whisper library for transcription.
+    Using local Whisper library for transcription, with a model borrowed from the shared pool.
     """
     try:
-        import whisper
+        import whisper  # noqa: F401
     except ImportError:
         raise ImportError("Please install 'openai-whisper' to use Local Whisper.")
 
-    print("Loading Whisper model...")
-    model = whisper.load_model("base")
     print("Starting transcription with Local Whisper...")
-    result = model.transcribe(audio_path, language=language)
+    segments = _speech_segments(audio_path, lambda p: _local_whisper_segments(p, language, model_size), vad)
+    return SegmentStore.from_segments(segments)
+
+def _local_whisper_segments(audio_path: str, language: str = None, model_size: str = "base") -> List[Dict]:
+    """
+    Transcribe one audio file with a pooled local model and return its segments.
+    """
+    with whisper_pool.acquire(model_size) as model:
+        result = model.transcribe(audio_path, language=language)
+    return result["segments"]
+
+def _transcribe_with_faster_whisper(
+    audio_path: str,
+    language: str = None,
+    model_size: str = "base",
+    beam_size: int = 1,
+    vad: bool = False
+) -> SegmentStore:
+    """
+    Using the int8-quantized CTranslate2 engine (faster-whisper) for CPU transcription.
+    """
+    try:
+        import faster_whisper  # noqa: F401
+    except ImportError:
+        raise ImportError("Please install 'faster-whisper' to use Faster Whisper.")
 
-    transcript = ""
+    print("Starting transcription with Faster Whisper (int8)...")
+    segments = _speech_segments(audio_path, lambda p: _faster_whisper_segments(p, language, model_size, beam_size), vad)
+    return SegmentStore.from_segments(segments)
 
-    for segment in result["segments"]:
-        time = format_time(segment["start"])
-        transcript += f"{time} {segment['text'].strip()}\n"
+def _faster_whisper_segments(audio_path: str, language: str = None, model_size: str = "base", beam_size: int = 1) -> List[Dict]:
+    """
+    Transcribe one audio file with a pooled int8 model and return its segments.
+    """
+    if language == "auto":
+        language = None
 
-    return transcript
\ No newline at end of file
+    with whisper_pool.acquire(model_size, engine="faster") as model:
+        # segments is a lazy generator, decoding happens while it is consumed
+        segments, _ = model.transcribe(audio_path, language=language, beam_size=beam_size)
+        return [{"start": seg.start, "end": seg.end, "text": seg.text} for seg in segments]
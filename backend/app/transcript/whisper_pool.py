@@ -0,0 +1,117 @@
+# backend/app/transcript/whisper_pool.py
+
+import time
+import queue
+import asyncio
+import logging
+import threading
+
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+from backend.app.utils.config import (
+    WHISPER_MODEL_SIZES,
+    WHISPER_MODEL_REPLICAS,
+    FASTER_WHISPER_MODEL_SIZES,
+    FASTER_WHISPER_CPU_THREADS,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# "openai" is the fp32 openai-whisper engine, "faster" is the int8 CTranslate2 engine
+ENGINES = ("openai", "faster")
+
+def load_model(engine: str, size: str, cpu_threads: int = FASTER_WHISPER_CPU_THREADS) -> Any:
+    """
+    Load one model instance for the given engine.
+    """
+    if engine == "faster":
+        from faster_whisper import WhisperModel
+        return WhisperModel(size, device="cpu", compute_type="int8", cpu_threads=cpu_threads)
+
+    import whisper
+    return whisper.load_model(size)
+
+class WhisperModelPool:
+    """
+    Process-wide pool of loaded local Whisper models.
+    Each (engine, size) holds a fixed number of replicas; a replica is used by one job at a time,
+    which bounds concurrent local transcriptions per model.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._pools = {}
+        return cls._instance
+
+    def _load_size(self, engine: str, size: str, replicas: int) -> None:
+        """
+        Load the replicas of a model into its queue.
+        """
+        start_time = time.time()
+        logger.info(f"Loading {engine} Whisper model '{size}' x{replicas}...")
+        pool = queue.Queue()
+        for _ in range(replicas):
+            pool.put(load_model(engine, size))
+        self._pools[(engine, size)] = pool
+        logger.info(f"{engine} Whisper model '{size}' loaded in {time.time() - start_time:.1f}s")
+
+    def load(self, sizes: Optional[List[str]] = None, replicas: Optional[int] = None, engine: str = "openai") -> None:
+        """
+        Load the given model sizes if they are not already loaded.
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown Whisper engine: {engine}")
+        if sizes is None:
+            sizes = FASTER_WHISPER_MODEL_SIZES if engine == "faster" else WHISPER_MODEL_SIZES
+        replicas = max(1, replicas or WHISPER_MODEL_REPLICAS)
+
+        with self._lock:
+            for size in sizes:
+                if (engine, size) not in self._pools:
+                    self._load_size(engine, size, replicas)
+
+    async def initialize(self) -> None:
+        """
+        Preload the configured model sizes of every installed engine without blocking the event loop.
+        """
+        loop = asyncio.get_event_loop()
+        for engine, module in (("openai", "whisper"), ("faster", "faster_whisper")):
+            try:
+                __import__(module)
+            except ImportError:
+                logger.warning(f"{module} is not installed, skipping {engine} Whisper model preload.")
+                continue
+            await loop.run_in_executor(None, lambda: self.load(engine=engine))
+
+    @contextmanager
+    def acquire(self, size: str = "base", timeout: Optional[float] = None, engine: str = "openai"):
+        """
+        Borrow a loaded model, waiting while all replicas of that model are busy.
+        Models that were not preloaded are loaded on first use.
+        """
+        key = (engine, size)
+        if key not in self._pools:
+            self.load([size], engine=engine)
+
+        try:
+            model = self._pools[key].get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No {engine} Whisper model '{size}' available after {timeout}s")
+
+        try:
+            yield model
+        finally:
+            self._pools[key].put(model)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Number of idle replicas per loaded model.
+        """
+        return {f"{engine}:{size}": pool.qsize() for (engine, size), pool in self._pools.items()}
+
+# Global instance
+whisper_pool = WhisperModelPool()
@@ -23,7 +23,15 @@ DEFAULT_CONFIG = {
     "max_output_tokens": 4096,
     "provider": "GROQ",
     "base_url": "https://api.groq.com/openai/v1",
-    "model": "llama-3.3-70b-versatile"
+    "model": "llama-3.3-70b-versatile",
+    "chunked_transcription": True,
+    "audio_chunk_seconds": 600,
+    "whisper_model": "base",
+    "use_cache": True,
+    "streaming_pipeline": False,
+    "stream_segment_seconds": 300,
+    "vad_filter": False,
+    "beam_size": 1
 }
 
 GOOGLE_API_KEYS = [key for key in (
@@ -42,6 +50,73 @@ GROQ_API_KEYS = [key for key in (
 
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
 
+# Groq rejects uploads above this size, larger files must be chunked
+GROQ_MAX_UPLOAD_MB = 25
+
+# Local Whisper models kept loaded for the lifetime of the process
+WHISPER_MODEL_SIZES = [size.strip() for size in os.environ.get("WHISPER_MODEL_SIZES", "base").split(",") if size.strip()]
+WHISPER_MODEL_REPLICAS = int(os.environ.get("WHISPER_MODEL_REPLICAS", "1"))
+# int8 CTranslate2 models for the "Faster Whisper" method; 0 threads lets CTranslate2 decide
+FASTER_WHISPER_MODEL_SIZES = [size.strip() for size in os.environ.get("FASTER_WHISPER_MODEL_SIZES", "").split(",") if size.strip()]
+FASTER_WHISPER_CPU_THREADS = int(os.environ.get("FASTER_WHISPER_CPU_THREADS", "0"))
+
+# Upper bound on transcription jobs processing audio at the same time; scales with the
+# transcription keys like BATCH_DEFAULT_CONCURRENCY, so a batch is not capped below its own limit
+MAX_CONCURRENT_TRANSCRIPTIONS = int(os.environ.get("MAX_CONCURRENT_TRANSCRIPTIONS", str(max(4, 2 * len(GROQ_API_KEYS)))))
+
+# Background transcription job pool
+TRANSCRIPTION_WORKERS = int(os.environ.get("TRANSCRIPTION_WORKERS", "8"))
+MAX_TRACKED_JOBS = int(os.environ.get("MAX_TRACKED_JOBS", "1000"))
+# Default batch concurrency: two items in flight per transcription key.
+# Raising it only helps if MAX_CONCURRENT_TRANSCRIPTIONS and TRANSCRIPTION_WORKERS are at least as high.
+BATCH_DEFAULT_CONCURRENCY = int(os.environ.get("BATCH_DEFAULT_CONCURRENCY", str(max(2, 2 * len(GROQ_API_KEYS)))))
+
+# Transcript cache limits, shared by the disk and Mongo tiers
+TRANSCRIPT_CACHE_MAX_ENTRIES = int(os.environ.get("TRANSCRIPT_CACHE_MAX_ENTRIES", "1000"))
+TRANSCRIPT_CACHE_MAX_MB = int(os.environ.get("TRANSCRIPT_CACHE_MAX_MB", "500"))
+TRANSCRIPT_CACHE_MAX_AGE_DAYS = int(os.environ.get("TRANSCRIPT_CACHE_MAX_AGE_DAYS", "30"))
+
+# Per-key LLM quota (requests and tokens per minute), defaults match the Gemini Flash free tier
+LLM_KEY_RPM = int(os.environ.get("LLM_KEY_RPM", "15"))
+LLM_KEY_TPM = int(os.environ.get("LLM_KEY_TPM", "1000000"))
+
+# LLM retries with exponential backoff, then failover to OpenAI when OPENAI_API_KEY is set
+LLM_MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", "3"))
+LLM_RETRY_BASE_DELAY = float(os.environ.get("LLM_RETRY_BASE_DELAY", "1.0"))
+LLM_FALLBACK_MODEL = os.environ.get("LLM_FALLBACK_MODEL", "gpt-4o-mini")
+# Hedged requests: a duplicate call is sent once the first runs past the observed p95 latency
+LLM_HEDGE_REQUESTS = os.environ.get("LLM_HEDGE_REQUESTS", "false").lower() == "true"
+LLM_HEDGE_DEFAULT_DELAY = float(os.environ.get("LLM_HEDGE_DEFAULT_DELAY", "15"))
+
+# LLM response cache: in-memory LRU over a SQLite file
+LLM_CACHE_ENABLED = os.environ.get("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_PATH = os.environ.get("LLM_CACHE_PATH", "backend/app/llm_cache/responses.sqlite3")
+LLM_CACHE_MEMORY_ENTRIES = int(os.environ.get("LLM_CACHE_MEMORY_ENTRIES", "512"))
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "20000"))
+LLM_CACHE_TTL_HOURS = float(os.environ.get("LLM_CACHE_TTL_HOURS", "168"))
+
+# Transcript chunking shared by every agent: token budget per chunk and the tiktoken encoding it is counted in
+CHUNK_TOKENS = int(os.environ.get("CHUNK_TOKENS", "10000"))
+CHUNK_ENCODING = os.environ.get("CHUNK_ENCODING", "cl100k_base")
+
+# Tree-reduce summarization: concurrent LLM calls per summary and token budget of one merge prompt
+SUMMARY_MAX_CONCURRENCY = int(os.environ.get("SUMMARY_MAX_CONCURRENCY", "8"))
+SUMMARY_MERGE_TOKEN_BUDGET = int(os.environ.get("SUMMARY_MERGE_TOKEN_BUDGET", "8000"))
+
+# Local violation pre-filter: chunks scoring below threshold - margin skip the LLM.
+# Score = max cosine similarity to the law corpus + weight * negative sentiment confidence.
+# Mode "off" (default), "shadow" (score and log, send every chunk) or "enforce" (skip low scorers).
+# The thresholds are uncalibrated, so run in shadow mode on labelled data before enforcing.
+VIOLATION_PREFILTER_MODE = os.environ.get("VIOLATION_PREFILTER_MODE", "off").lower()
+VIOLATION_PREFILTER_THRESHOLD = float(os.environ.get("VIOLATION_PREFILTER_THRESHOLD", "0.45"))
+VIOLATION_PREFILTER_MARGIN = float(os.environ.get("VIOLATION_PREFILTER_MARGIN", "0.1"))
+VIOLATION_PREFILTER_SENTIMENT_WEIGHT = float(os.environ.get("VIOLATION_PREFILTER_SENTIMENT_WEIGHT", "0.15"))
+
+# Chat sessions: idle sessions expire, and the least recently used ones are dropped past the cap
+CHAT_MAX_SESSIONS = int(os.environ.get("CHAT_MAX_SESSIONS", "1000"))
+CHAT_SESSION_IDLE_TTL = int(os.environ.get("CHAT_SESSION_IDLE_TTL", "3600"))
+CHAT_MAX_HISTORY = int(os.environ.get("CHAT_MAX_HISTORY", "50"))
+
 class APIKeys:
     def __init__(self, keys: list = GROQ_API_KEYS):
         self.keys = keys
@@ -1,38 +1,285 @@
 # backend/app/utils/ffmpeg_utils.py
 # -*- coding: utf-8 -*-
 
+import os
+import re
+import time
+import bisect
 import subprocess
-from typing import List, Optional
+import numpy as np
+from typing import Iterator, List, Optional, Tuple
 
-def process_audio_file(input_path: str, output_path: str) -> None:
+# Low-bitrate mono MP3, small enough for transcription API upload limits
+MP3_OUTPUT_ARGS = ['-vn', '-ar', '16000', '-ac', '1', '-b:a', '32k', '-f', 'mp3']
+# Raw 16 kHz mono PCM, for consumers that analyse samples directly
+PCM_OUTPUT_ARGS = ['-vn', '-ar', '16000', '-ac', '1', '-acodec', 'pcm_s16le', '-f', 's16le']
+# Input format of the raw PCM above, when fed back to ffmpeg on stdin
+PCM_INPUT_ARGS = ['-f', 's16le', '-ar', '16000', '-ac', '1']
+PCM_SAMPLE_RATE = 16000
+
+def _input_args(input_source: str, input_format_args: Optional[List[str]] = None) -> List[str]:
+    """
+    Build ffmpeg input arguments; remote inputs are read over HTTP with reconnects.
+    """
+    args = ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-y']
+    if input_source.startswith(('http://', 'https://')):
+        args.extend(['-reconnect', '1', '-reconnect_streamed', '1', '-reconnect_delay_max', '5'])
+    if input_format_args:
+        args.extend(input_format_args)
+    args.extend(['-i', input_source])
+    return args
+
+def transcode_audio(
+    input_source: str,
+    output_path: Optional[str] = None,
+    input_data: Optional[bytes] = None,
+    output_args: Optional[List[str]] = None,
+    input_format_args: Optional[List[str]] = None
+) -> Optional[bytes]:
     """
-    Convert audio to low-quality MP3 for API limits.
+    Decode any audio/video input and encode it for transcription in a single ffmpeg pass.
+    input_source can be a local path, an http(s) URL, or '-' to read input_data from stdin.
+    If output_path is None the encoded audio is returned as bytes instead of written to disk.
+    """
+    command = _input_args(input_source, input_format_args) + (output_args or MP3_OUTPUT_ARGS)
+    command.append(output_path or 'pipe:1')
+
+    try:
+        result = subprocess.run(command, input=input_data, check=True, capture_output=True)
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Error transcoding audio: {e.stderr.decode(errors='replace')}")
+
+    return None if output_path else result.stdout
+
+def get_audio_duration(input_path: str) -> float:
+    """
+    Return the duration of an audio file in seconds using ffprobe.
     """
     command = [
-        'ffmpeg', '-y', '-i', input_path,
-        '-ar', '16000',
-        '-ac', '1',
-        '-b:a', '32k',
-        output_path
+        'ffprobe', '-v', 'error',
+        '-show_entries', 'format=duration',
+        '-of', 'default=noprint_wrappers=1:nokey=1',
+        input_path
     ]
     try:
-        subprocess.run(command, check=True, capture_output=True, text=True)
+        result = subprocess.run(command, check=True, capture_output=True, text=True)
+        return float(result.stdout.strip())
+    except (subprocess.CalledProcessError, ValueError) as e:
+        raise RuntimeError(f"Cannot read audio duration for {input_path}: {e}")
+
+def detect_silences(
+    input_path: str,
+    noise_db: int = -30,
+    min_silence: float = 0.5
+) -> List[Tuple[float, float]]:
+    """
+    Detect silent spans with ffmpeg's silencedetect filter.
+    Returns a list of (start, end) tuples in seconds.
+    """
+    command = [
+        'ffmpeg', '-hide_banner', '-nostats', '-i', input_path,
+        '-af', f'silencedetect=noise={noise_db}dB:d={min_silence}',
+        '-f', 'null', '-'
+    ]
+    try:
+        result = subprocess.run(command, check=True, capture_output=True, text=True)
     except subprocess.CalledProcessError as e:
-        print(f"Error processing audio file: {e.stderr}")
+        print(f"Error detecting silences: {e.stderr}")
+        return []
+
+    starts = [float(m) for m in re.findall(r'silence_start:\s*(-?[\d.]+)', result.stderr)]
+    ends = [float(m) for m in re.findall(r'silence_end:\s*(-?[\d.]+)', result.stderr)]
+    return [(max(start, 0.0), end) for start, end in zip(starts, ends)]
+
+def plan_split_points(
+    duration: float,
+    silences: List[Tuple[float, float]],
+    max_chunk_seconds: float
+) -> List[Tuple[float, float]]:
+    """
+    Plan (start, end) chunk boundaries no longer than max_chunk_seconds,
+    cutting in the middle of the last silence before each limit when possible.
+    """
+    midpoints = sorted((start + end) / 2 for start, end in silences)
+    chunks = []
+    start = 0.0
+
+    while duration - start > max_chunk_seconds:
+        limit = start + max_chunk_seconds
+        # Prefer a silence in the second half of the window so chunks stay balanced
+        candidates = [m for m in midpoints if start + max_chunk_seconds / 2 < m <= limit]
+        end = candidates[-1] if candidates else limit
+        chunks.append((start, end))
+        start = end
 
-def convert_to_wav(input_path: str, output_wav: str, ffmpeg_args: Optional[List[str]] = None) -> None:
+    chunks.append((start, duration))
+    return chunks
+
+def split_audio_at_silences(
+    input_path: str,
+    output_dir: str,
+    max_chunk_seconds: float = 600
+) -> List[Tuple[str, float]]:
     """
-    Extract and convert audio to WAV format.
+    Split an audio file into chunks at silence boundaries.
+    Returns a list of (chunk_path, offset_seconds) tuples.
     """
-    args = ['ffmpeg', '-y', '-i', input_path, '-vn']
+    duration = get_audio_duration(input_path)
+    if duration <= max_chunk_seconds:
+        return [(input_path, 0.0)]
+
+    silences = detect_silences(input_path)
+    boundaries = plan_split_points(duration, silences, max_chunk_seconds)
+
+    base, ext = os.path.splitext(os.path.basename(input_path))
+    chunks = []
+    for index, (start, end) in enumerate(boundaries):
+        chunk_path = os.path.join(output_dir, f"{base}_chunk{index:03d}{ext}")
+        command = [
+            'ffmpeg', '-y', '-ss', f"{start:.3f}", '-t', f"{end - start:.3f}",
+            '-i', input_path, '-c', 'copy', chunk_path
+        ]
+        try:
+            subprocess.run(command, check=True, capture_output=True, text=True)
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"Error splitting audio chunk {index}: {e.stderr}")
+        chunks.append((chunk_path, start))
 
-    if ffmpeg_args:
-        args.extend(ffmpeg_args)
-    else:
-        args.extend(['-acodec', 'pcm_s16le', '-ar', '16000', '-ac', '1'])
-    args.append(output_wav)
+    return chunks
 
+def stream_segments(
+    input_source: str,
+    output_dir: str,
+    segment_seconds: float = 300,
+    poll_interval: float = 0.5
+) -> Iterator[Tuple[str, float]]:
+    """
+    Transcode input into fixed-length MP3 segments with one ffmpeg process and yield
+    (segment_path, offset_seconds) as soon as each segment is finished, while the
+    input is still being read. ffmpeg appends to the CSV segment list only after
+    closing a segment, so every yielded file is complete.
+    """
+    list_path = os.path.join(output_dir, "segments.csv")
+    command = _input_args(input_source) + MP3_OUTPUT_ARGS[:-2] + [
+        '-f', 'segment',
+        '-segment_format', 'mp3',
+        '-segment_time', str(segment_seconds),
+        '-reset_timestamps', '1',
+        '-segment_list', list_path,
+        '-segment_list_type', 'csv',
+        os.path.join(output_dir, 'segment_%04d.mp3')
+    ]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+    emitted = 0
     try:
-        subprocess.run(args, check=True, capture_output=True, text=True)
-    except subprocess.CalledProcessError as e:
-        print(f"Error converting to WAV: {e.stderr}")
\ No newline at end of file
+        while True:
+            finished = process.poll() is not None
+            if os.path.exists(list_path):
+                with open(list_path, "r", encoding="utf-8") as f:
+                    # Only newline-terminated lines are complete entries
+                    lines = f.read().split('\n')[:-1]
+                for line in lines[emitted:]:
+                    filename, start, _ = line.rsplit(',', 2)
+                    yield os.path.join(output_dir, filename), float(start)
+                    emitted += 1
+            if finished:
+                break
+            time.sleep(poll_interval)
+
+        if process.returncode != 0:
+            raise RuntimeError(f"Error streaming audio segments: {process.stderr.read().decode(errors='replace')}")
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+
+# (trimmed_start, original_start, duration) in seconds, one entry per kept speech span
+OffsetMap = List[Tuple[float, float, float]]
+
+def detect_speech_spans(
+    samples: np.ndarray,
+    sample_rate: int = PCM_SAMPLE_RATE,
+    frame_ms: int = 30,
+    threshold_db: float = -45.0,
+    margin_db: float = 12.0,
+    min_silence_ms: int = 800,
+    padding_ms: int = 300
+) -> List[Tuple[float, float]]:
+    """
+    Energy-based voice activity detection on 16-bit mono samples.
+    A frame is voiced when its RMS level is above both threshold_db and the
+    estimated noise floor plus margin_db. Gaps shorter than min_silence_ms are
+    kept, and every span is padded so word edges are not clipped.
+    Returns (start, end) speech spans in seconds.
+    """
+    frame_len = int(sample_rate * frame_ms / 1000)
+    n_frames = len(samples) // frame_len
+    if n_frames == 0:
+        return [(0.0, len(samples) / sample_rate)] if len(samples) else []
+
+    frames = samples[:n_frames * frame_len].astype(np.float32).reshape(n_frames, frame_len) / 32768.0
+    level_db = 20 * np.log10(np.sqrt(np.mean(frames ** 2, axis=1)) + 1e-10)
+    noise_floor = np.percentile(level_db, 10)
+    voiced = level_db > max(threshold_db, noise_floor + margin_db)
+
+    # Rising/falling edges of the voiced mask give run boundaries in frames
+    edges = np.diff(np.concatenate(([0], voiced.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    if len(starts) == 0:
+        return []
+
+    max_gap = min_silence_ms // frame_ms
+    padding = padding_ms // frame_ms
+    spans = []
+    for start, end in zip(starts, ends):
+        start, end = max(0, start - padding), min(n_frames, end + padding)
+        if spans and start - spans[-1][1] <= max_gap:
+            spans[-1][1] = max(spans[-1][1], end)
+        else:
+            spans.append([start, end])
+
+    frame_seconds = frame_len / sample_rate
+    total_seconds = len(samples) / sample_rate
+    return [
+        (start * frame_seconds, total_seconds if end == n_frames else end * frame_seconds)
+        for start, end in spans
+    ]
+
+def trim_silence(input_path: str, output_path: str, **vad_kwargs) -> OffsetMap:
+    """
+    Drop non-speech spans from an audio file and write the remaining speech as MP3.
+    Returns the offset map needed to translate times in the trimmed audio back to
+    the original; an empty map means no speech was found and nothing was written.
+    """
+    pcm = transcode_audio(input_path, output_args=PCM_OUTPUT_ARGS)
+    samples = np.frombuffer(pcm, dtype=np.int16)
+    spans = detect_speech_spans(samples, **vad_kwargs)
+    if not spans:
+        return []
+
+    offset_map = []
+    pieces = []
+    trimmed_start = 0.0
+    for start, end in spans:
+        offset_map.append((trimmed_start, start, end - start))
+        pieces.append(samples[int(start * PCM_SAMPLE_RATE):int(end * PCM_SAMPLE_RATE)])
+        trimmed_start += end - start
+
+    speech = np.concatenate(pieces)
+    transcode_audio('-', output_path, input_data=speech.tobytes(), input_format_args=PCM_INPUT_ARGS)
+
+    total_seconds = len(samples) / PCM_SAMPLE_RATE
+    print(f"VAD kept {trimmed_start:.1f}s of {total_seconds:.1f}s audio ({len(spans)} speech spans)")
+    return offset_map
+
+def map_to_original(seconds: float, offset_map: OffsetMap) -> float:
+    """
+    Translate a time in trimmed audio back to the original audio's timeline.
+    """
+    if not offset_map:
+        return seconds
+    index = max(0, bisect.bisect_right([entry[0] for entry in offset_map], seconds) - 1)
+    trimmed_start, original_start, duration = offset_map[index]
+    return original_start + min(max(seconds - trimmed_start, 0.0), duration)
@@ -19,6 +19,7 @@ from transformers import (
     pipeline
 )
 from keybert import KeyBERT
+from backend.app.transcript.segments import SegmentStore
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -261,13 +262,14 @@ def group_sentences_(sentences: List[Dict[str, str]], max_tokens: int = 400) ->
     
     return groups
 
-async def score_selection_ultra_fast(text: str, top_n: int = 5) -> List[Dict[str, Any]]:
+async def score_selection_ultra_fast(text: str, top_n: int = 5, segments: Optional[SegmentStore] = None) -> List[Dict[str, Any]]:
     """Ultra-optimized scoring with parallel processing"""
     start_time = time.time()
     
     await model_manager.initialize()
     
-    sentences = split_transcript_(text)
+    # Stored segments skip re-parsing the transcript string
+    sentences = segments.sentences() if segments is not None else split_transcript_(text)
     if not sentences:
         return []
     
@@ -364,9 +366,9 @@ def extract_keywords(text: str, top_n: int = 5) -> List[str]:
     """Legacy compatibility for keyword extraction"""
     return list(_cached_keywords(text, top_n))
 
-async def score_selection(text: str, top_n: int = 5) -> List[Dict[str, Any]]:
+async def score_selection(text: str, top_n: int = 5, segments: Optional[SegmentStore] = None) -> List[Dict[str, Any]]:
     """Legacy compatibility for scoring selection"""
-    return await score_selection_ultra_fast(text, top_n)
+    return await score_selection_ultra_fast(text, top_n, segments)
 
 def prompt_highlights(highlights: List[Dict[str, Any]]) -> str:
     """Generate highlight prompts"""
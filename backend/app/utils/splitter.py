@@ -1,29 +1,58 @@
 # backend/app/utils/splitter.py
 
 import re
+import zlib
+import weakref
+import tiktoken
 
-from typing import List
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
+from backend.app.transcript.segments import SegmentStore
+from backend.app.utils.config import CHUNK_TOKENS, CHUNK_ENCODING
+
+class TranscriptChunk(NamedTuple):
+    """
+    A run of whole transcript segments. start/end are in seconds (None for untimed text).
+    """
+    text: str
+    start: Optional[float]
+    end: Optional[float]
+    tokens: int
+
+@lru_cache(maxsize=None)
+def get_encoder(encoding_name: str = CHUNK_ENCODING) -> tiktoken.Encoding:
+    """
+    Shared tiktoken encoder; loading one parses its BPE ranks, so it is done once.
+    """
+    return tiktoken.get_encoding(encoding_name)
+
+def count_tokens(text: str) -> int:
+    return len(get_encoder().encode(text, disallowed_special=()))
+
+@lru_cache(maxsize=16)
+def _recursive_splitter(chunk_size: int, chunk_overlap: int) -> RecursiveCharacterTextSplitter:
+    return RecursiveCharacterTextSplitter.from_tiktoken_encoder(
+        encoding_name=CHUNK_ENCODING,
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        separators=["\n\n", "\n", ".", " ", ""]
+    )
 
 def text_splitter(
     text: str,
-    chunk_size: int = 10000, 
+    chunk_size: int = CHUNK_TOKENS,
     chunk_overlap: int = 200
 ) -> List[str]:
     """
     Splits the input text into smaller chunks for processing.
     """
-    text_splitter = RecursiveCharacterTextSplitter.from_tiktoken_encoder(
-        chunk_size=chunk_size,
-        chunk_overlap=chunk_overlap,
-        separators=["\n\n", "\n", ".", " ", ""]
-    )
-    return text_splitter.split_text(text)
+    return _recursive_splitter(chunk_size, chunk_overlap).split_text(text)
 
 def text_splitter_documents(
-    documents: List[str], 
-    chunk_size: int = 2000, 
+    documents: List[str],
+    chunk_size: int = 2000,
     chunk_overlap: int = 200
 ) -> List[str]:
     """
@@ -37,22 +66,92 @@ def text_splitter_documents(
     return text_splitter.split_documents(documents)
 
 def text_splitter_transcript(
-    transcript_text: str, 
-    transcript_id: str, 
-    chunk_size: int = 1000, 
-    chunk_overlap: int = 200
+    transcript_text: str,
+    transcript_id: str,
+    chunk_size: int = 256,
+    chunk_overlap: int = 50
 ) -> List[Document]:
     """
     Splits a transcript text into smaller chunks and returns a list of Document objects.
+    Timestamped transcripts go through the shared segment chunker and carry each chunk's time range.
     """
+    segments = SegmentStore.from_transcript(transcript_text)
+    if len(segments):
+        return [
+            Document(
+                page_content=chunk.text,
+                metadata={"transcript_id": transcript_id, "start": chunk.start, "end": chunk.end}
+            )
+            for chunk in chunk_segments(segments, chunk_size)
+        ]
 
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=chunk_size,
-        chunk_overlap=chunk_overlap,
-        separators=["\n\n", "\n", ". ", "! ", "? ", " ", ""]
-    )
-    
-    chunks = text_splitter.split_text(transcript_text)
-    documents = [Document(page_content=chunk, metadata={"transcript_id": transcript_id}) for chunk in chunks]
-    
-    return documents
\ No newline at end of file
+    chunks = _recursive_splitter(chunk_size, chunk_overlap).split_text(transcript_text)
+    return [Document(page_content=chunk, metadata={"transcript_id": transcript_id}) for chunk in chunks]
+
+def _is_anchor(text: str) -> bool:
+    # About one segment in eight is an anchor; crc32 is stable across processes
+    return zlib.crc32(text.encode("utf-8")) % 8 == 0
+
+# Chunks computed per SegmentStore, keyed by (segment count, chunk_size, content_defined).
+# Agents running on the same transcript share one computation.
+_chunk_cache: "weakref.WeakKeyDictionary[SegmentStore, Dict[Tuple, List[TranscriptChunk]]]" = weakref.WeakKeyDictionary()
+
+def chunk_segments(
+    segments: SegmentStore,
+    chunk_size: int = CHUNK_TOKENS,
+    content_defined: bool = True
+) -> List[TranscriptChunk]:
+    """
+    Packs whole "HH:MM:SS text" lines into chunks of at most chunk_size tokens
+    (counted exactly with the shared encoder), so no chunk cuts through a line.
+    A line longer than chunk_size becomes a chunk on its own.
+    With content_defined, a chunk past 3/4 of its budget also ends after an anchor
+    segment chosen by content, so an edit or an append only changes the chunks
+    around it and later boundaries realign.
+    """
+    key = (len(segments), chunk_size, content_defined)
+    cached = _chunk_cache.get(segments)
+    if cached is not None and key in cached:
+        return cached[key]
+
+    encoder = get_encoder()
+    chunks: List[TranscriptChunk] = []
+    lines: List[str] = []
+    start = 0
+    current_tokens = 0
+
+    def close(end: int) -> None:
+        chunks.append(TranscriptChunk("".join(lines), segments.starts[start], segments.ends[end - 1], current_tokens))
+
+    for i in range(len(segments)):
+        line = f"{segments.line_at(i)}\n"
+        tokens = len(encoder.encode(line, disallowed_special=()))
+        if current_tokens + tokens > chunk_size and lines:
+            close(i)
+            lines, start, current_tokens = [], i, 0
+        lines.append(line)
+        current_tokens += tokens
+        if content_defined and current_tokens >= chunk_size * 3 // 4 and _is_anchor(segments.text_at(i)):
+            close(i + 1)
+            lines, start, current_tokens = [], i + 1, 0
+
+    if lines:
+        close(len(segments))
+
+    _chunk_cache.setdefault(segments, {})[key] = chunks
+    return chunks
+
+def transcript_chunks(
+    text: str,
+    segments: Optional[SegmentStore] = None,
+    chunk_size: int = CHUNK_TOKENS
+) -> List[TranscriptChunk]:
+    """
+    The chunking every agent uses: segment-aligned chunks when the transcript has
+    segments (or parseable timestamps), recursive token splitting for untimed text.
+    """
+    if segments is None or not len(segments):
+        segments = SegmentStore.from_transcript(text)
+    if len(segments):
+        return chunk_segments(segments, chunk_size)
+    return [TranscriptChunk(chunk, None, None, count_tokens(chunk)) for chunk in text_splitter(text, chunk_size)]